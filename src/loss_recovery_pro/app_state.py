@@ -5,9 +5,8 @@ from pathlib import Path
 from typing import Dict, Any, List, Optional
 import pandas as pd
 
-from .config import USER_CONFIG_FILE, DEPOSIT_INFO
-# calculator 임포트는 여기서 직접 사용하지 않으면 제거 가능, ui_sidebar에서 사용
-# from .calculator import calculate_actual_account_metrics
+from .config import USER_CONFIG_FILE, DEPOSIT_INFO, DEFAULT_TRADE_VOLATILITY_PCT
+from .calculator import solve_loss_inputs
 
 def _get_default_app_state() -> Dict[str, Any]:
     """애플리케이션의 기본 상태값을 반환합니다."""
@@ -29,6 +28,7 @@ def _get_default_app_state() -> Dict[str, Any]:
         "loss_margin_pct_at_loss": loss_margin_default,
         "actual_loss_amount": 0.0, # 초기값. ui_sidebar에서 실제 값으로 계산/업데이트됨.
         "max_recovery_trades": 5,
+        "trade_volatility_pct": DEFAULT_TRADE_VOLATILITY_PCT, # 청산 확률 계산용 1회 거래 변동성(%)
         "edited_data": {}, # 탭별, 레버리지별 수정된 DataFrame 저장
         "_sorted_deposit_keys": sorted_deposit_keys,
         "_config_loaded": False,
@@ -58,13 +58,23 @@ def load_user_config() -> Dict[str, Any]:
 def save_user_config(state_to_save: Dict[str, Any]):
     keys_to_save = ["initial_capital", "market_loss_input_pct",
                     "loss_margin_pct_at_loss", "max_recovery_trades",
-                    "actual_loss_amount"] # 'actual_loss_amount_input' 대신 'actual_loss_amount' 사용
+                    "actual_loss_amount", "trade_volatility_pct"] # 'actual_loss_amount_input' 대신 'actual_loss_amount' 사용
     
     config_data = {key: state_to_save.get(key) for key in keys_to_save if key in state_to_save}
 
     with open(USER_CONFIG_FILE, 'w', encoding='utf-8') as f:
         json.dump(config_data, f, indent=4)
 
+def _sync_loss_metrics():
+    """현재 원금/시장 손실률로 손실 금액과 실제 계좌 손실률을 계산하여 session_state에 반영합니다."""
+    _, calculated_loss_amount, _, actual_loss_pct = solve_loss_inputs(
+        st.session_state.loss_margin_pct_at_loss,
+        initial_capital=st.session_state.initial_capital,
+        market_loss_input_pct=st.session_state.market_loss_input_pct
+    )
+    st.session_state.actual_loss_amount = round(calculated_loss_amount, 0)
+    st.session_state.actual_account_loss_pct = actual_loss_pct
+
 def init_session_state():
     if "_config_loaded" not in st.session_state or not st.session_state._config_loaded:
         default_state = _get_default_app_state()
@@ -79,8 +89,17 @@ def init_session_state():
         if st.session_state.loss_margin_pct_at_loss not in st.session_state._sorted_deposit_keys:
             st.session_state.loss_margin_pct_at_loss = 40 
         
+        # 초기 로드 시 한 번만 손실 금액/실제 계좌 손실률을 동기화. 이후에는 ui_sidebar의 on_change 콜백에서만 갱신
+        _sync_loss_metrics()
+
         st.session_state._config_loaded = True
-        # 초기 로드 후, 실제 값 계산 및 동기화는 ui_sidebar에서 수행
+    else:
+        # 앱 업데이트 전에 시작된 세션에는 새로 추가된 상태 키가 없으므로 기본값으로 채움 (기존 값은 유지)
+        for key, default_value in _get_default_app_state().items():
+            if key not in st.session_state:
+                st.session_state[key] = default_value
+        if "actual_account_loss_pct" not in st.session_state:
+            _sync_loss_metrics()
 
 def update_state_and_save_config(key: str, value: Any, source_field: Optional[str] = None):
     st.session_state[key] = value
@@ -1,41 +1,100 @@
 # src/loss_recovery_pro/calculator.py
+import numpy as np
 import pandas as pd
-from typing import Tuple, List, Dict, Any, Optional
-from .config import TRANSACTION_FEE_RATE, DEPOSIT_INFO, COL_MARKET_GAIN_PCT, COL_CUMULATIVE_CAPITAL_AMT, COL_NET_PROFIT_AMT, COL_TRADE_ROUND
+from functools import lru_cache
+from typing import Tuple, List, Dict, Any, Optional, Sequence
+from .config import TRANSACTION_FEE_RATE, DEPOSIT_INFO, COL_MARKET_GAIN_PCT, COL_GAIN_BAND, COL_CUMULATIVE_CAPITAL_AMT, COL_NET_PROFIT_AMT, COL_TRADE_ROUND
 
 
-def calculate_actual_account_metrics(
-    initial_capital: float,
-    market_loss_input_pct: float,
-    loss_leverage: float
-) -> Tuple[float, float]:
-    # (이전과 동일)
-    if initial_capital <= 0:
-        return 0.0, 0.0
-    market_loss_ratio = market_loss_input_pct / 100.0
-    fee_on_entry_ratio = loss_leverage * TRANSACTION_FEE_RATE
-    leveraged_market_loss_ratio = market_loss_ratio * loss_leverage
-    total_loss_on_capital_ratio = leveraged_market_loss_ratio + fee_on_entry_ratio
-    actual_loss_percentage = total_loss_on_capital_ratio * 100.0
-    actual_loss_amount = initial_capital * total_loss_on_capital_ratio
-    return actual_loss_percentage, actual_loss_amount
-
-def calculate_initial_capital_from_loss_amount(
-    actual_loss_amount_input: float,
-    market_loss_input_pct: float,
-    loss_leverage: float
-) -> float:
-    # (이전과 동일)
-    if actual_loss_amount_input < 0: return 0.0
-    market_loss_ratio = market_loss_input_pct / 100.0
-    fee_on_entry_ratio = loss_leverage * TRANSACTION_FEE_RATE
-    leveraged_market_loss_ratio = market_loss_ratio * loss_leverage
-    total_loss_on_capital_ratio = leveraged_market_loss_ratio + fee_on_entry_ratio
-    if total_loss_on_capital_ratio <= 0:
-        if actual_loss_amount_input > 0 : return float('nan')
-        return 0.0
-    initial_capital = actual_loss_amount_input / total_loss_on_capital_ratio
-    return initial_capital if initial_capital >= 0 else 0.0
+# 증거금 비율 키별 (레버리지, 진입 수수료 비율) 계수표.
+# 실제 계좌 손실 비율 = 시장 손실 비율 × 레버리지 + 진입 수수료 비율 이므로 모듈 로드 시 한 번만 만듭니다.
+LOSS_RATIO_COEFFICIENTS: Dict[int, Tuple[float, float]] = {
+    deposit_pct_key: (info["leverage"], info["leverage"] * TRANSACTION_FEE_RATE)
+    for deposit_pct_key, info in DEPOSIT_INFO.items()
+}
+
+
+def solve_loss_inputs(
+    deposit_pct_key: int,
+    initial_capital: Optional[float] = None,
+    actual_loss_amount: Optional[float] = None,
+    market_loss_input_pct: Optional[float] = None
+) -> Tuple[float, float, float, float]:
+    """
+    {초기 원금, 실제 손실 금액, 시장 기준 손실률(%)} 중 두 값으로 나머지 하나를 구하고
+    (초기 원금, 실제 손실 금액, 시장 기준 손실률(%), 실제 계좌 총 손실률(%))을 반환합니다.
+    초기 원금이 0 이하이면 손실 금액/손실률은 0, 역산 시 총 손실 비율이 0 이하이면 원금은 nan(손실 금액이 양수일 때) 또는 0입니다.
+    """
+    if sum(v is None for v in (initial_capital, actual_loss_amount, market_loss_input_pct)) != 1:
+        raise ValueError("초기 원금, 실제 손실 금액, 시장 기준 손실률 중 정확히 두 값을 지정해야 합니다.")
+    leverage, fee_on_entry_ratio = LOSS_RATIO_COEFFICIENTS[deposit_pct_key]
+
+    if market_loss_input_pct is None:
+        if initial_capital <= 0 or leverage == 0:
+            market_loss_input_pct = float('nan')
+        else:
+            market_loss_input_pct = ((actual_loss_amount / initial_capital - fee_on_entry_ratio) / leverage) * 100.0
+
+    total_loss_on_capital_ratio = (market_loss_input_pct / 100.0) * leverage + fee_on_entry_ratio
+
+    if initial_capital is None:
+        if actual_loss_amount < 0:
+            initial_capital = 0.0
+        elif total_loss_on_capital_ratio <= 0:
+            initial_capital = float('nan') if actual_loss_amount > 0 else 0.0
+        else:
+            initial_capital = max(actual_loss_amount / total_loss_on_capital_ratio, 0.0)
+    elif actual_loss_amount is None:
+        actual_loss_amount = initial_capital * total_loss_on_capital_ratio if initial_capital > 0 else 0.0
+
+    actual_loss_pct = total_loss_on_capital_ratio * 100.0 if initial_capital > 0 else 0.0
+    return initial_capital, actual_loss_amount, market_loss_input_pct, actual_loss_pct
+
+
+def solve_loss_inputs_batch(
+    deposit_pct_keys: Sequence[int],
+    initial_capitals: Optional[Sequence[float]] = None,
+    actual_loss_amounts: Optional[Sequence[float]] = None,
+    market_loss_input_pcts: Optional[Sequence[float]] = None
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    solve_loss_inputs의 배열 버전 (CLI/API 일괄 처리용). 지정하지 않은 한 종류의 값을 모든 행에 대해 구하고
+    (초기 원금, 실제 손실 금액, 시장 기준 손실률(%), 실제 계좌 총 손실률(%)) 배열을 반환합니다.
+    """
+    if sum(v is None for v in (initial_capitals, actual_loss_amounts, market_loss_input_pcts)) != 1:
+        raise ValueError("초기 원금, 실제 손실 금액, 시장 기준 손실률 중 정확히 두 종류를 지정해야 합니다.")
+    coefficients = LOSS_RATIO_COEFFICIENTS
+    leverages = np.array([coefficients[key][0] for key in deposit_pct_keys], dtype=np.float64)
+    fee_on_entry_ratios = np.array([coefficients[key][1] for key in deposit_pct_keys], dtype=np.float64)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        if market_loss_input_pcts is None:
+            capitals = np.asarray(initial_capitals, dtype=np.float64)
+            losses = np.asarray(actual_loss_amounts, dtype=np.float64)
+            market_pcts = np.where(
+                (capitals > 0) & (leverages != 0),
+                ((losses / capitals - fee_on_entry_ratios) / leverages) * 100.0,
+                np.nan
+            )
+        else:
+            market_pcts = np.asarray(market_loss_input_pcts, dtype=np.float64)
+
+        total_loss_ratios = (market_pcts / 100.0) * leverages + fee_on_entry_ratios
+
+        if initial_capitals is None:
+            losses = np.asarray(actual_loss_amounts, dtype=np.float64)
+            capitals = np.select(
+                [losses < 0, total_loss_ratios <= 0],
+                [0.0, np.where(losses > 0, np.nan, 0.0)],
+                default=np.maximum(losses / total_loss_ratios, 0.0)
+            )
+        else:
+            capitals = np.asarray(initial_capitals, dtype=np.float64)
+            if actual_loss_amounts is None:
+                losses = np.where(capitals > 0, capitals * total_loss_ratios, 0.0)
+
+    actual_loss_pcts = np.where(capitals > 0, total_loss_ratios * 100.0, 0.0)
+    return capitals, losses, market_pcts, actual_loss_pcts
 
 def calculate_market_gain_from_net_profit(
     net_profit_amount: float,
@@ -63,7 +122,12 @@ def calculate_market_gain_from_net_profit(
         return float('inf') if net_profit_amount > 0 else 0.0
 
 
-def generate_recovery_table_data(
+def _filled_step_columns(trade_steps: int, market_gain_pct: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """모든 회차가 같은 수익률(nan: 원금 없음, inf: 회복불가)이고 자본·순수익이 0인 결과 (조기 반환 공용 경로)."""
+    return np.full(trade_steps, market_gain_pct), np.zeros(trade_steps), np.zeros(trade_steps)
+
+
+def calculate_recovery_steps(
     initial_capital: float,
     actual_total_loss_pct: float,
     recovery_leverage: float,
@@ -74,26 +138,27 @@ def generate_recovery_table_data(
     # 예: edited_field_priority[n] == 'gain' 이면, n회차는 edited_gains_pct[n]을 사용.
     # 예: edited_field_priority[n] == 'profit' 이면, n회차는 edited_net_profits[n]을 사용하고 이를 바탕으로 gain 계산.
     edited_field_priority: Optional[List[Optional[str]]] = None
-) -> pd.DataFrame:
-    # ... (초기 빈 테이블 반환 로직 등은 이전과 동일) ...
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    회차별 (시장 수익률(%), 누적 자본, 순수익)을 컬럼별 float64 배열로 계산합니다.
+    원금이 없어 계산할 수 없는 회차의 수익률은 nan, 회복불가 회차는 inf 입니다.
+    """
     if initial_capital <= 0:
-        empty_data = {COL_TRADE_ROUND: [f"{i+1}회차" for i in range(trade_steps)], COL_MARKET_GAIN_PCT: ['N/A'] * trade_steps, COL_CUMULATIVE_CAPITAL_AMT: [f"₩ 0"] * trade_steps, COL_NET_PROFIT_AMT: [f"₩ 0"] * trade_steps}
-        return pd.DataFrame(empty_data)
+        return _filled_step_columns(trade_steps, np.nan)
 
     all_gains_none = not edited_gains_pct or all(g is None for g in edited_gains_pct)
     all_profits_none = not edited_net_profits or all(p is None for p in edited_net_profits)
 
     if actual_total_loss_pct >= 100.0 and all_gains_none and all_profits_none:
-        empty_data = {COL_TRADE_ROUND: [f"{i+1}회차" for i in range(trade_steps)], COL_MARKET_GAIN_PCT: ['∞ (회복불가)'] * trade_steps, COL_CUMULATIVE_CAPITAL_AMT: [f"₩ 0"] * trade_steps, COL_NET_PROFIT_AMT: [f"₩ 0"] * trade_steps}
-        return pd.DataFrame(empty_data)
+        return _filled_step_columns(trade_steps, np.inf)
 
     remaining_capital_after_loss = initial_capital * max(0, (1.0 - actual_total_loss_pct / 100.0))
     current_capital_amount_for_step_start = remaining_capital_after_loss
     target_final_capital = initial_capital
-    data_rows = []
-
-    # 확정된 (사용자 입력 또는 이전 계산 결과) 시장 수익률 저장용
-    final_market_gains_for_steps: List[Optional[float]] = [None] * trade_steps
+    # 회차 수만큼 미리 할당한 컬럼 배열에 바로 기록 (행 단위 dict/list 생성 없음)
+    market_gains_pct = np.empty(trade_steps, dtype=np.float64)
+    cumulative_capitals = np.empty(trade_steps, dtype=np.float64)
+    net_profits = np.empty(trade_steps, dtype=np.float64)
 
     for n in range(trade_steps):
         trade_fee_ratio_on_position = recovery_leverage * TRANSACTION_FEE_RATE
@@ -143,8 +208,6 @@ def generate_recovery_table_data(
                 else:
                     market_gain_pct_this_step = ((required_asset_ratio_this_step - 1.0 + trade_fee_ratio_on_position) / recovery_leverage) * 100.0
         
-        final_market_gains_for_steps[n] = market_gain_pct_this_step # 확정된 수익률 저장
-
         # 확정된 market_gain_pct_this_step을 사용하여 자본 및 순수익 업데이트
         net_profit_this_step_amount: float
         current_capital_after_trade: float
@@ -160,14 +223,180 @@ def generate_recovery_table_data(
             net_profit_this_step_amount = 0.0
             current_capital_after_trade = 0.0 if not is_user_edited_this_step else current_capital_amount_for_step_start # 사용자가 직접 입력한 경우 이전 자본 유지 또는 0 처리
 
-        gain_display = f"{market_gain_pct_this_step:.2f}%" if market_gain_pct_this_step != float('inf') else '∞ (회복불가)'
-        data_rows.append({
-            COL_TRADE_ROUND: f"{n+1}회차",
-            COL_MARKET_GAIN_PCT: gain_display, # 화면 표시용은 확정된 수익률
-            COL_CUMULATIVE_CAPITAL_AMT: f"₩ {current_capital_after_trade:,.0f}",
-            COL_NET_PROFIT_AMT: f"₩ {net_profit_this_step_amount:,.0f}",
-        })
-        
+        market_gains_pct[n] = market_gain_pct_this_step # 확정된 수익률
+        cumulative_capitals[n] = current_capital_after_trade
+        net_profits[n] = net_profit_this_step_amount
+
         current_capital_amount_for_step_start = current_capital_after_trade
 
-    return pd.DataFrame(data_rows)
\ No newline at end of file
+    return market_gains_pct, cumulative_capitals, net_profits
+
+
+def _fill_auto_segment(
+    market_gains_pct: np.ndarray,
+    cumulative_capitals: np.ndarray,
+    net_profits: np.ndarray,
+    start: int,
+    end: int,
+    capital_at_start: float,
+    target_final_capital: float,
+    recovery_leverage: float,
+    trade_steps: int
+) -> float:
+    """
+    사용자 수정이 없는 연속 회차 [start, end)를 한 번에 계산하고 구간 종료 시점 자본을 반환합니다.
+    자동 계산 회차는 매번 (목표/현재 자본)^(1/남은 횟수) 비율로 자본을 키우므로,
+    구간 내 모든 회차의 필요 자산 비율과 시장 수익률은 구간 시작 시점의 값과 같습니다.
+    """
+    if capital_at_start <= 0:
+        market_gains_pct[start:end] = np.inf
+        cumulative_capitals[start:end] = 0.0
+        net_profits[start:end] = 0.0
+        return 0.0
+
+    required_asset_ratio = (target_final_capital / capital_at_start) ** (1 / (trade_steps - start))
+    if required_asset_ratio == float('inf'):
+        # 첫 회차에서 회복불가로 자본이 0이 되면 이후 회차도 모두 회복불가
+        market_gains_pct[start:end] = np.inf
+        cumulative_capitals[start:end] = 0.0
+        net_profits[start:end] = 0.0
+        return 0.0
+
+    trade_fee_ratio_on_position = recovery_leverage * TRANSACTION_FEE_RATE
+    market_gain_pct = ((required_asset_ratio - 1.0 + trade_fee_ratio_on_position) / recovery_leverage) * 100.0
+    net_change_on_capital_ratio = (market_gain_pct / 100.0) * recovery_leverage - trade_fee_ratio_on_position
+    capitals_after = capital_at_start * np.power(1.0 + net_change_on_capital_ratio, np.arange(1, end - start + 1))
+
+    market_gains_pct[start:end] = market_gain_pct
+    cumulative_capitals[start:end] = capitals_after
+    net_profits[start] = capital_at_start * net_change_on_capital_ratio
+    net_profits[start + 1:end] = capitals_after[:-1] * net_change_on_capital_ratio
+    return float(capitals_after[-1])
+
+
+def calculate_recovery_steps_vectorized(
+    initial_capital: float,
+    actual_total_loss_pct: float,
+    recovery_leverage: float,
+    trade_steps: int,
+    edited_gains_pct: Optional[List[Optional[float]]] = None,
+    edited_net_profits: Optional[List[Optional[float]]] = None,
+    edited_field_priority: Optional[List[Optional[str]]] = None
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    calculate_recovery_steps와 같은 결과를 numpy 배열로 계산합니다.
+    사용자 수정 회차만 한 회차씩 계산하고, 그 사이의 자동 계산 구간은 닫힌 식으로 한 번에 채웁니다.
+    (회차별로 누적되는 부동소수점 오차만큼 기준 루프와 미세하게 다를 수 있음)
+    """
+    if initial_capital <= 0:
+        return _filled_step_columns(trade_steps, np.nan)
+    if recovery_leverage == 0:
+        # 레버리지 0의 1.00001 허용 오차 규칙은 구간 단위 닫힌 식이 없으므로 기준 루프 사용
+        return calculate_recovery_steps(
+            initial_capital, actual_total_loss_pct, recovery_leverage, trade_steps,
+            edited_gains_pct, edited_net_profits, edited_field_priority
+        )
+
+    all_gains_none = not edited_gains_pct or all(g is None for g in edited_gains_pct)
+    all_profits_none = not edited_net_profits or all(p is None for p in edited_net_profits)
+
+    if actual_total_loss_pct >= 100.0 and all_gains_none and all_profits_none:
+        return _filled_step_columns(trade_steps, np.inf)
+
+    market_gains_pct = np.empty(trade_steps, dtype=np.float64)
+    cumulative_capitals = np.empty(trade_steps, dtype=np.float64)
+    net_profits = np.empty(trade_steps, dtype=np.float64)
+
+    # 사용자 수정 회차: 'profit' 우선순위 + 순수익 입력, 또는 수익률 입력이 있는 회차 (calculate_recovery_steps와 동일한 판정)
+    edited_steps = sorted(
+        {n for n, g in enumerate(edited_gains_pct or []) if g is not None and n < trade_steps} |
+        {n for n, p in enumerate(edited_net_profits or []) if p is not None and n < trade_steps and
+         edited_field_priority and n < len(edited_field_priority) and edited_field_priority[n] == 'profit'}
+    )
+
+    trade_fee_ratio_on_position = recovery_leverage * TRANSACTION_FEE_RATE
+    target_final_capital = initial_capital
+    current_capital = initial_capital * max(0, (1.0 - actual_total_loss_pct / 100.0))
+    segment_start = 0
+
+    for n in edited_steps:
+        if n > segment_start:
+            current_capital = _fill_auto_segment(
+                market_gains_pct, cumulative_capitals, net_profits, segment_start, n,
+                current_capital, target_final_capital, recovery_leverage, trade_steps
+            )
+
+        priority_this_step = edited_field_priority[n] if edited_field_priority and n < len(edited_field_priority) and edited_field_priority[n] is not None else 'gain'
+        user_edited_profit = edited_net_profits[n] if edited_net_profits and n < len(edited_net_profits) else None
+        if priority_this_step == 'profit' and user_edited_profit is not None:
+            calculated_gain = calculate_market_gain_from_net_profit(user_edited_profit, current_capital, recovery_leverage)
+            market_gain_pct_this_step = calculated_gain if calculated_gain is not None else float('inf')
+        else:
+            market_gain_pct_this_step = edited_gains_pct[n]
+
+        if market_gain_pct_this_step != float('inf'):
+            net_change_on_capital_ratio = (market_gain_pct_this_step / 100.0) * recovery_leverage - trade_fee_ratio_on_position
+            net_profits[n] = current_capital * net_change_on_capital_ratio
+            current_capital = max(0, current_capital * (1.0 + net_change_on_capital_ratio))
+        else:
+            net_profits[n] = 0.0 # 사용자가 직접 입력한 회복불가 수익률은 자본 유지
+        market_gains_pct[n] = market_gain_pct_this_step
+        cumulative_capitals[n] = current_capital
+        segment_start = n + 1
+
+    if segment_start < trade_steps:
+        _fill_auto_segment(
+            market_gains_pct, cumulative_capitals, net_profits, segment_start, trade_steps,
+            current_capital, target_final_capital, recovery_leverage, trade_steps
+        )
+    return market_gains_pct, cumulative_capitals, net_profits
+
+@lru_cache(maxsize=64)
+def _trade_round_labels(trade_steps: int) -> Tuple[str, ...]:
+    # '1회차', '2회차', ... 는 표마다 같으므로 거래 횟수별로 재사용
+    return tuple(f"{i+1}회차" for i in range(trade_steps))
+
+
+def build_recovery_table(
+    market_gains_pct: np.ndarray,
+    cumulative_capitals: np.ndarray,
+    net_profits: np.ndarray,
+    gain_band_labels: Optional[Sequence[str]] = None,
+    extra_columns: Optional[Dict[str, np.ndarray]] = None
+) -> pd.DataFrame:
+    """
+    calculate_recovery_steps의 컬럼 배열을 화면 표시용 DataFrame으로 변환합니다.
+    gain_band_labels가 주어지면 수익률 컬럼 바로 뒤에 COL_GAIN_BAND로, extra_columns(예: build_risk_columns 결과)는
+    맨 뒤에 그대로 붙입니다. 모든 컬럼을 미리 만든 배열로 모아 DataFrame을 한 번만 생성합니다
+    (생성 후 insert/컬럼 대입은 블록 재구성 비용이 표마다 반복됨).
+    """
+    columns: Dict[str, Any] = {
+        COL_TRADE_ROUND: np.array(_trade_round_labels(len(market_gains_pct)), dtype=object),
+        COL_MARKET_GAIN_PCT: np.array([
+            'N/A' if g != g else '∞ (회복불가)' if g == float('inf') else f"{g:.2f}%"
+            for g in market_gains_pct.tolist()
+        ], dtype=object),
+    }
+    if gain_band_labels is not None:
+        columns[COL_GAIN_BAND] = np.asarray(gain_band_labels, dtype=object)
+    columns[COL_CUMULATIVE_CAPITAL_AMT] = np.array([f"₩ {c:,.0f}" for c in cumulative_capitals.tolist()], dtype=object)
+    columns[COL_NET_PROFIT_AMT] = np.array([f"₩ {p:,.0f}" for p in net_profits.tolist()], dtype=object)
+    if extra_columns:
+        columns.update(extra_columns)
+    return pd.DataFrame(columns, copy=False)
+
+
+def generate_recovery_table_data(
+    initial_capital: float,
+    actual_total_loss_pct: float,
+    recovery_leverage: float,
+    trade_steps: int,
+    edited_gains_pct: Optional[List[Optional[float]]] = None,
+    edited_net_profits: Optional[List[Optional[float]]] = None,
+    edited_field_priority: Optional[List[Optional[str]]] = None
+) -> pd.DataFrame:
+    """회차별 복구 시나리오를 계산하여 화면 표시용 DataFrame으로 반환합니다."""
+    return build_recovery_table(*calculate_recovery_steps(
+        initial_capital, actual_total_loss_pct, recovery_leverage, trade_steps,
+        edited_gains_pct, edited_net_profits, edited_field_priority
+    ))
\ No newline at end of file
@@ -1,5 +1,5 @@
 # src/loss_recovery_pro/config.py
-from typing import Dict
+from typing import Dict, Optional
 
 # 증거금 비율(%)과 해당 레버리지 배율 매핑
 # 예: 증거금 40%는 레버리지 2.5배를 의미
@@ -16,11 +16,51 @@ DEPOSIT_INFO: Dict[int, Dict[str, float]] = {
 # 예: 0.1%는 0.001로 표현
 TRANSACTION_FEE_RATE: float = 0.001
 
+# 유지 증거금률: 순자산이 포지션 평가금액의 이 비율 아래로 떨어지면 마진콜(반대매매)로 간주
+# 예: 0.1은 순자산이 평가금액의 10% 미만이 되는 시점
+MAINTENANCE_MARGIN_RATE: float = 0.1
+
+# 청산 확률 계산에 사용하는 1회 거래 동안의 시장 변동성(표준편차, %) 기본값
+DEFAULT_TRADE_VOLATILITY_PCT: float = 3.0
+
 # 사용자 입력값 저장을 위한 JSON 파일 경로
 USER_CONFIG_FILE: str = "loss_recovery_config.json"
 
 # DataFrame에 표시될 컬럼명 (편집 및 계산에 사용)
 COL_TRADE_ROUND = "거래 회차"
 COL_MARKET_GAIN_PCT = "시장 수익률(%)" # 사용자가 편집 가능
+COL_GAIN_BAND = "수익률 구간" # 표시 전용 (편집 불가)
 COL_CUMULATIVE_CAPITAL_AMT = "누적 자본(₩)"
-COL_NET_PROFIT_AMT = "회차별 순수익(₩)"
\ No newline at end of file
+COL_NET_PROFIT_AMT = "회차별 순수익(₩)"
+COL_LIQUIDATION_DISTANCE_PCT = "청산 하락폭(%)" # 표시 전용 (편집 불가)
+COL_RUIN_PROBABILITY_PCT = "누적 청산 확률(%)" # 표시 전용 (편집 불가)
+
+# 내보내기(long format) 전용 컬럼명
+COL_RECOVERY_HORIZON = "복구 거래 횟수"
+COL_DEPOSIT_PCT = "증거금 비율(%)"
+COL_RECOVERY_LEVERAGE = "레버리지(배)"
+
+# 내보내기 시 한 번에 기록할 최소 행 수 (Parquet row group / CSV·XLSX 청크 단위)
+EXPORT_ROW_GROUP_ROWS: int = 65536
+
+# 사이드바 '최대 복구 거래 횟수' 슬라이더의 상한
+MAX_RECOVERY_TRADES_LIMIT: int = 20
+
+# 계산 결과 캐시 최대 항목 수 (사용자 수정이 없는 표 단위)
+RESULT_CACHE_MAX_ENTRIES: int = 4096
+
+# 다음 입력값 예측 계산에 사용할 백그라운드 스레드 수 (CPU 사용 상한)
+# 어느 엔진이든 계산 중에는 GIL을 잡고 있어 스레드를 늘려도 빨라지지 않고 화면 rerun과 GIL만 다투므로 기본 1개로 제한
+SPECULATIVE_MAX_WORKERS: int = 1
+
+
+# 복구 표 계산 엔진: "vectorized" (numpy 구간 계산, 기본값) 또는 "loop" (기준 순수 파이썬 루프, 차등 퍼징 기준)
+RECOVERY_ENGINE: str = "vectorized"
+
+# 표 단위 계산 실행 방식: "auto", "serial", "thread", "process"
+# "auto"는 계산량이 PARALLEL_MIN_TOTAL_STEPS 이상일 때만 프로세스 풀을 사용 (두 엔진 모두 GIL을 잡고 계산하므로
+# 스레드 풀은 직렬보다 빠르지 않음). 화면 rerun은 최대 수백 단계라 항상 직렬이며, 풀은 API/장기 시나리오 호출용.
+# 기준값: 36개 표 × 1000단계(3.6만 단계)를 직렬로 약 40ms에 계산하며, 그보다 작으면 풀 전달/직렬화 비용이 이득보다 큼
+TABLE_EXECUTOR: str = "auto"
+TABLE_EXECUTOR_MAX_WORKERS: Optional[int] = None # None이면 CPU 코어 수
+PARALLEL_MIN_TOTAL_STEPS: int = 20000
@@ -0,0 +1,195 @@
+# src/loss_recovery_pro/diff_fuzz.py
+"""
+기준 루프(calculate_recovery_steps)와 빠른 계산 엔진의 결과를 무작위 입력으로 대조하는 차분 퍼즈 도구.
+
+사용 예 (src 디렉토리에서):
+    python -m loss_recovery_pro.diff_fuzz --cases 1000000 --workers 8 --engine vectorized
+    python -m loss_recovery_pro.diff_fuzz --replay 12345 --seed 0   # 보고된 불일치 케이스 재현
+"""
+import argparse
+import math
+import os
+import random
+import sys
+import time
+from multiprocessing import Pool
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from .config import DEPOSIT_INFO
+from .calculator import calculate_recovery_steps
+from .executor import RECOVERY_ENGINES, TableJob
+
+RESULT_LABELS = ("시장 수익률(%)", "누적 자본", "순수익")
+MAX_REPORTED_DIVERGENCES = 20
+
+
+def _pin_like_ui(value: float, decimals: int) -> Optional[float]:
+    # 화면 문자열(예: '12.34%', '₩ 1,234')을 다시 파싱한 값처럼 반올림. '∞ (회복불가)', 'N/A'는 None
+    if not math.isfinite(value):
+        return None
+    return float(f"{value:.{decimals}f}")
+
+
+def generate_case(rng: random.Random) -> TableJob:
+    """원금 0·음수, 100% 이상 손실, 레버리지 0, 회복불가 이후 고정 행 등 경계 조건을 포함한 입력 하나를 생성합니다."""
+    initial_capital = rng.choice([0.0, -rng.uniform(1, 1e6), rng.uniform(1, 1e4), rng.uniform(1e5, 1e8), 1e6])
+    actual_total_loss_pct = rng.choice([0.0, 100.0, rng.uniform(100.0, 150.0), rng.uniform(0.0, 100.0), rng.uniform(0.0, 30.0)])
+    recovery_leverage = rng.choice([info["leverage"] for info in DEPOSIT_INFO.values()] + [0.0, rng.uniform(0.1, 10.0)])
+    trade_steps = rng.choice([1, 2, rng.randint(1, 20), rng.randint(1, 20), rng.randint(20, 500)])
+
+    edit_style = rng.random()
+    if edit_style < 0.25: # 수정 없음
+        return (initial_capital, actual_total_loss_pct, recovery_leverage, trade_steps, None, None, None)
+
+    edited_gains: List[Optional[float]] = [None] * trade_steps
+    edited_profits: List[Optional[float]] = [None] * trade_steps
+    edit_priority: List[Optional[str]] = [None] * trade_steps
+
+    if edit_style < 0.65:
+        # 화면 편집과 같은 형태: 마지막 수정 행까지는 표에 보이던 값(반올림)을 고정하고, 마지막 수정 행은 한 필드만 사용
+        last_edited_row = rng.randrange(trade_steps)
+        shown_gains, _, shown_profits = calculate_recovery_steps(initial_capital, actual_total_loss_pct, recovery_leverage, trade_steps)
+        for n in range(last_edited_row):
+            edited_gains[n] = _pin_like_ui(shown_gains[n], 2)
+            edited_profits[n] = _pin_like_ui(shown_profits[n], 0)
+        if rng.random() < 0.5:
+            edit_priority[last_edited_row] = 'gain'
+            edited_gains[last_edited_row] = rng.choice([rng.uniform(-50.0, 100.0), 0.0, float('inf'), rng.uniform(-150.0, -90.0)])
+        else:
+            edit_priority[last_edited_row] = 'profit'
+            edited_profits[last_edited_row] = rng.choice([rng.uniform(-1e6, 1e6), 0.0, rng.uniform(-1e8, 1e8)])
+    else:
+        # 임의 조합: 우선순위와 값이 서로 맞지 않는 경우, 리스트 길이가 회차 수와 다른 경우 포함
+        edit_density = rng.random()
+        list_length = max(0, trade_steps + rng.choice([0, 0, 0, -1, 1, -trade_steps]))
+        edited_gains = [rng.choice([rng.uniform(-100.0, 150.0), float('inf'), 0.0]) if rng.random() < edit_density else None for _ in range(list_length)]
+        edited_profits = [rng.choice([rng.uniform(-1e7, 1e7), 0.0]) if rng.random() < edit_density else None for _ in range(list_length)]
+        edit_priority = [rng.choice([None, 'gain', 'profit']) for _ in range(list_length)]
+
+    return (initial_capital, actual_total_loss_pct, recovery_leverage, trade_steps, edited_gains, edited_profits, edit_priority)
+
+
+def _values_match(expected: float, actual: float, rtol: float, atol: float) -> bool:
+    if math.isnan(expected) or math.isnan(actual):
+        return math.isnan(expected) and math.isnan(actual)
+    if math.isinf(expected) or math.isinf(actual):
+        return expected == actual
+    return abs(expected - actual) <= atol + rtol * abs(expected)
+
+
+def compare_results(
+    expected: Tuple[Sequence[float], ...],
+    actual: Tuple[Sequence[float], ...],
+    rtol: float,
+    atol: float
+) -> Optional[str]:
+    """두 결과가 허용 오차 안에서 같으면 None, 다르면 첫 불일치 설명을 반환합니다."""
+    for label, expected_values, actual_values in zip(RESULT_LABELS, expected, actual):
+        if len(expected_values) != len(actual_values):
+            return f"{label}: 길이 불일치 {len(expected_values)} != {len(actual_values)}"
+        for n, (e, a) in enumerate(zip(expected_values, actual_values)):
+            if not _values_match(float(e), float(a), rtol, atol):
+                return f"{label}: {n+1}회차 기준={float(e)!r} 후보={float(a)!r}"
+    return None
+
+
+def _run_chunk(args: Tuple[str, int, int, int, float, float]) -> Tuple[int, int, List[Dict[str, Any]]]:
+    # (처리 수, 불일치 수, 보고할 불일치 최대 MAX_REPORTED_DIVERGENCES건)을 반환
+    engine, seed, start, count, rtol, atol = args
+    candidate = RECOVERY_ENGINES[engine][0]
+    divergences: List[Dict[str, Any]] = []
+    divergent_cases = 0
+    for case_index in range(start, start + count):
+        job = generate_case(random.Random(seed * 1_000_003 + case_index))
+        expected = calculate_recovery_steps(*job)
+        try:
+            mismatch = compare_results(expected, candidate(*job), rtol, atol)
+        except Exception as e: # 후보 엔진의 예외도 불일치로 보고
+            mismatch = f"예외 발생: {e!r}"
+        if not mismatch:
+            continue
+        divergent_cases += 1
+        if len(divergences) < MAX_REPORTED_DIVERGENCES:
+            divergences.append({"case": case_index, "detail": mismatch, "job": job})
+    return count, divergent_cases, divergences
+
+
+def run_differential_fuzz(
+    engine: str,
+    cases: int,
+    workers: int,
+    seed: int = 0,
+    rtol: float = 1e-9,
+    atol: float = 1e-6,
+    chunk_size: int = 5000
+) -> Dict[str, Any]:
+    """cases개의 무작위 입력을 workers개 프로세스로 나눠 대조하고 (처리 수, 전체 불일치 수, 보고할 불일치, 처리량)을 반환합니다."""
+    if engine not in RECOVERY_ENGINES:
+        raise ValueError(f"알 수 없는 계산 엔진입니다: {engine}")
+    chunks = [(engine, seed, start, min(chunk_size, cases - start), rtol, atol) for start in range(0, cases, chunk_size)]
+    started_at = time.perf_counter()
+    checked = 0
+    divergences: List[Dict[str, Any]] = []
+    divergent_cases = 0
+    if workers <= 1:
+        chunk_results = map(_run_chunk, chunks)
+        pool = None
+    else:
+        pool = Pool(processes=workers)
+        chunk_results = pool.imap_unordered(_run_chunk, chunks)
+    try:
+        for count, chunk_divergent_cases, chunk_divergences in chunk_results:
+            checked += count
+            divergent_cases += chunk_divergent_cases
+            divergences.extend(chunk_divergences[:MAX_REPORTED_DIVERGENCES - len(divergences)])
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+    elapsed = time.perf_counter() - started_at
+    return {
+        "engine": engine,
+        "checked": checked,
+        "divergences": sorted(divergences, key=lambda d: d["case"]),
+        "divergent_cases": divergent_cases,
+        "elapsed_sec": elapsed,
+        "cases_per_sec": checked / elapsed if elapsed > 0 else float('inf'),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="기준 루프와 빠른 계산 엔진의 결과 차분 퍼즈")
+    parser.add_argument("--engine", default="vectorized", choices=sorted(RECOVERY_ENGINES), help="대조할 후보 엔진")
+    parser.add_argument("--cases", type=int, default=100_000, help="생성할 입력 수")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="병렬 프로세스 수")
+    parser.add_argument("--seed", type=int, default=0, help="입력 생성 시드 (케이스 번호와 함께 재현에 사용)")
+    parser.add_argument("--rtol", type=float, default=1e-9, help="상대 허용 오차")
+    parser.add_argument("--atol", type=float, default=1e-6, help="절대 허용 오차 (금액 단위)")
+    parser.add_argument("--replay", type=int, default=None, help="지정한 케이스 번호 하나만 재현하여 상세 출력")
+    args = parser.parse_args(argv)
+
+    if args.replay is not None:
+        job = generate_case(random.Random(args.seed * 1_000_003 + args.replay))
+        expected = calculate_recovery_steps(*job)
+        actual = RECOVERY_ENGINES[args.engine][0](*job)
+        print(f"입력: {job!r}")
+        for label, e, a in zip(RESULT_LABELS, expected, actual):
+            print(f"{label}\n  기준: {[float(v) for v in e]!r}\n  후보: {[float(v) for v in a]!r}")
+        mismatch = compare_results(expected, actual, args.rtol, args.atol)
+        print(mismatch or "일치")
+        return 1 if mismatch else 0
+
+    report = run_differential_fuzz(args.engine, args.cases, args.workers, args.seed, args.rtol, args.atol)
+    print(f"엔진: {report['engine']} / 검사: {report['checked']:,}건 / "
+          f"{report['elapsed_sec']:.1f}초 ({report['cases_per_sec']:,.0f}건/초, 기준 루프 실행 포함)")
+    if not report["divergences"]:
+        print("불일치 없음")
+        return 0
+    print(f"불일치 발견: 전체 {report['divergent_cases']:,}건 (최대 {MAX_REPORTED_DIVERGENCES}건 표시):")
+    for divergence in report["divergences"]:
+        print(f"  케이스 {divergence['case']}: {divergence['detail']}  (--replay {divergence['case']} --seed {args.seed})")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
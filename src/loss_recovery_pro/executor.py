@@ -0,0 +1,83 @@
+# src/loss_recovery_pro/executor.py
+"""
+서로 독립적인 복구 표(거래 횟수 × 증거금 비율) 계산을 설정된 실행기(직렬/스레드/프로세스)로 분배하고,
+결과를 요청 순서대로 모아 반환합니다.
+
+화면 rerun 한 번의 계산량은 최대 수백 단계(탭 6개 × 증거금 비율 6개, 최대 20회)라서 "auto"에서는 항상 직렬로
+실행됩니다. 풀은 수만 단계 이상을 한 번에 요청하는 API/장기 시나리오 호출자만을 위한 경로입니다.
+"""
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Executor, ThreadPoolExecutor, ProcessPoolExecutor
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .config import RECOVERY_ENGINE, TABLE_EXECUTOR, TABLE_EXECUTOR_MAX_WORKERS, PARALLEL_MIN_TOTAL_STEPS
+from .calculator import calculate_recovery_steps, calculate_recovery_steps_vectorized
+
+# 엔진 이름 -> (계산 함수, "auto" 실행 시 사용할 풀 종류)
+# 두 엔진 모두 GIL을 잡은 채로 계산하므로 (vectorized도 수정 구간마다 파이썬 루프를 돌고 배열이 수십 개 이하라
+# numpy가 GIL을 풀어 얻는 이득이 없음) 스레드로는 빨라지지 않으며 프로세스로만 병렬화됩니다.
+RECOVERY_ENGINES: Dict[str, Tuple[Callable, str]] = {
+    "loop": (calculate_recovery_steps, "process"),
+    "vectorized": (calculate_recovery_steps_vectorized, "process"),
+}
+
+# calculate_recovery_steps의 위치 인자 순서와 동일:
+# (초기 원금, 실제 계좌 손실률(%), 복구 레버리지, 거래 횟수, 수정 수익률, 수정 순수익, 수정 우선순위)
+TableJob = Tuple[float, float, float, int, Optional[List[Optional[float]]], Optional[List[Optional[float]]], Optional[List[Optional[str]]]]
+
+_pools: Dict[str, Executor] = {}
+_pools_lock = threading.Lock()
+
+
+def _get_pool(kind: str) -> Executor:
+    """프로세스 전체에서 공유하는 스레드/프로세스 풀을 필요할 때 생성합니다."""
+    with _pools_lock:
+        if kind not in _pools:
+            max_workers = TABLE_EXECUTOR_MAX_WORKERS or os.cpu_count() or 1
+            if kind == "thread":
+                _pools[kind] = ThreadPoolExecutor(max_workers=max_workers)
+            else:
+                # Streamlit 서버는 스레드를 여러 개 띄운 상태이므로 fork 대신 깨끗한 프로세스에서 작업자를 시작
+                start_method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+                _pools[kind] = ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context(start_method))
+        return _pools[kind]
+
+
+def _run_job(engine: str, job: TableJob):
+    # 프로세스 풀로 보낼 수 있도록 모듈 최상위 함수로 정의 (엔진은 이름으로 전달)
+    return RECOVERY_ENGINES[engine][0](*job)
+
+
+def resolve_executor_kind(jobs: Sequence[TableJob], engine: str = RECOVERY_ENGINE, executor_kind: str = TABLE_EXECUTOR) -> str:
+    """"auto"를 계산량과 엔진에 따라 "serial", "thread", "process" 중 하나로 결정합니다."""
+    if executor_kind != "auto":
+        return executor_kind
+    if len(jobs) < 2 or sum(job[3] for job in jobs) < PARALLEL_MIN_TOTAL_STEPS:
+        return "serial" # 작은 표는 풀로 보내는 비용이 계산보다 큼
+    return RECOVERY_ENGINES[engine][1]
+
+
+def compute_recovery_tables(
+    jobs: Sequence[TableJob],
+    engine: str = RECOVERY_ENGINE,
+    executor_kind: str = TABLE_EXECUTOR
+) -> List[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+    """
+    각 job을 engine으로 계산한 (시장 수익률(%), 누적 자본, 순수익) 결과를 jobs와 같은 순서로 반환합니다.
+    """
+    if engine not in RECOVERY_ENGINES:
+        raise ValueError(f"알 수 없는 계산 엔진입니다: {engine}")
+    kind = resolve_executor_kind(jobs, engine, executor_kind)
+    if kind == "serial":
+        return [_run_job(engine, job) for job in jobs]
+    if kind not in ("thread", "process"):
+        raise ValueError(f"알 수 없는 실행 방식입니다: {executor_kind}")
+
+    pool = _get_pool(kind)
+    # 프로세스 풀은 작업 묶음 단위로 전달하여 직렬화/IPC 횟수를 줄임
+    chunksize = max(1, len(jobs) // ((TABLE_EXECUTOR_MAX_WORKERS or os.cpu_count() or 1) * 4)) if kind == "process" else 1
+    return list(pool.map(_run_job, [engine] * len(jobs), jobs, chunksize=chunksize))
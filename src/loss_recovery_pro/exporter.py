@@ -0,0 +1,155 @@
+# src/loss_recovery_pro/exporter.py
+"""
+모든 시나리오 표(복구 거래 횟수 × 증거금 비율)를 하나의 long format 파일로 내보냅니다.
+금액/수익률은 '₩' 문자열이 아닌 숫자 컬럼으로 기록하며, 청크 단위로 스트리밍 기록합니다.
+"""
+import io
+import importlib.util
+from typing import Iterable, Iterator, List, Optional, Tuple, BinaryIO, Union
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .config import (
+    DEPOSIT_INFO, EXPORT_ROW_GROUP_ROWS, DEFAULT_TRADE_VOLATILITY_PCT,
+    COL_RECOVERY_HORIZON, COL_DEPOSIT_PCT, COL_RECOVERY_LEVERAGE,
+    COL_TRADE_ROUND, COL_MARKET_GAIN_PCT, COL_CUMULATIVE_CAPITAL_AMT, COL_NET_PROFIT_AMT,
+    COL_LIQUIDATION_DISTANCE_PCT, COL_RUIN_PROBABILITY_PCT
+)
+from .calculator import calculate_recovery_steps
+from .risk import build_risk_columns
+
+# 포맷별 (MIME 타입, 확장자, 필요한 선택 패키지)
+EXPORT_FORMATS = {
+    "csv": ("text/csv", ".csv", None),
+    "parquet": ("application/vnd.apache.parquet", ".parquet", "pyarrow"),
+    "xlsx": ("application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", ".xlsx", "openpyxl"),
+}
+
+EXPORT_COLUMNS = [
+    COL_RECOVERY_HORIZON, COL_DEPOSIT_PCT, COL_RECOVERY_LEVERAGE, COL_TRADE_ROUND,
+    COL_MARKET_GAIN_PCT, COL_CUMULATIVE_CAPITAL_AMT, COL_NET_PROFIT_AMT,
+    COL_LIQUIDATION_DISTANCE_PCT, COL_RUIN_PROBABILITY_PCT,
+]
+
+# (복구 거래 횟수, 증거금 비율 키, (수정 수익률, 수정 순수익, 수정 우선순위) 또는 None)
+EditInputs = Tuple[List[Optional[float]], List[Optional[float]], List[Optional[str]]]
+Scenario = Tuple[int, int, Optional[EditInputs]]
+
+
+def available_export_formats() -> List[str]:
+    """현재 환경에 설치된 패키지로 기록 가능한 포맷 목록을 반환합니다."""
+    return [
+        fmt for fmt, (_, _, required_module) in EXPORT_FORMATS.items()
+        if required_module is None or importlib.util.find_spec(required_module) is not None
+    ]
+
+
+def iter_scenario_frames(
+    initial_capital: float,
+    actual_total_loss_pct: float,
+    scenarios: Iterable[Scenario],
+    trade_volatility_pct: float = DEFAULT_TRADE_VOLATILITY_PCT
+) -> Iterator[pd.DataFrame]:
+    """시나리오별 계산 결과를 숫자 컬럼만으로 이루어진 long format DataFrame으로 하나씩 생성합니다."""
+    for trade_steps, deposit_pct_key, edit_inputs in scenarios:
+        recovery_leverage = DEPOSIT_INFO[deposit_pct_key]["leverage"]
+        margin_rate = DEPOSIT_INFO[deposit_pct_key]["margin_rate"]
+        edited_gains, edited_profits, edit_priority = edit_inputs if edit_inputs else (None, None, None)
+        market_gains, cumulative_capitals, net_profits = calculate_recovery_steps(
+            initial_capital=initial_capital,
+            actual_total_loss_pct=actual_total_loss_pct,
+            recovery_leverage=recovery_leverage,
+            trade_steps=trade_steps,
+            edited_gains_pct=edited_gains,
+            edited_net_profits=edited_profits,
+            edited_field_priority=edit_priority
+        )
+        yield pd.DataFrame({
+            COL_RECOVERY_HORIZON: np.full(trade_steps, trade_steps, dtype=np.int64),
+            COL_DEPOSIT_PCT: np.full(trade_steps, deposit_pct_key, dtype=np.int64),
+            COL_RECOVERY_LEVERAGE: np.full(trade_steps, recovery_leverage, dtype=np.float64),
+            COL_TRADE_ROUND: np.arange(1, trade_steps + 1, dtype=np.int64),
+            COL_MARKET_GAIN_PCT: np.asarray(market_gains, dtype=np.float64),
+            COL_CUMULATIVE_CAPITAL_AMT: np.asarray(cumulative_capitals, dtype=np.float64),
+            COL_NET_PROFIT_AMT: np.asarray(net_profits, dtype=np.float64),
+            **build_risk_columns(market_gains, margin_rate, trade_volatility_pct),
+        }, columns=EXPORT_COLUMNS)
+
+
+def _iter_row_groups(frames: Iterable[pd.DataFrame], min_rows: int) -> Iterator[pd.DataFrame]:
+    """작은 시나리오 표들을 min_rows 이상이 될 때까지 모아서 하나의 청크로 내보냅니다."""
+    pending: List[pd.DataFrame] = []
+    pending_rows = 0
+    for frame in frames:
+        pending.append(frame)
+        pending_rows += len(frame)
+        if pending_rows >= min_rows:
+            yield pd.concat(pending, ignore_index=True) if len(pending) > 1 else pending[0]
+            pending, pending_rows = [], 0
+    if pending:
+        yield pd.concat(pending, ignore_index=True) if len(pending) > 1 else pending[0]
+
+
+def _write_csv(row_groups: Iterable[pd.DataFrame], target: BinaryIO):
+    # utf-8-sig: 엑셀에서 한글 컬럼명이 깨지지 않도록 BOM 포함
+    text_stream = io.TextIOWrapper(target, encoding="utf-8-sig", newline="")
+    try:
+        pd.DataFrame(columns=EXPORT_COLUMNS).to_csv(text_stream, index=False)
+        for chunk in row_groups:
+            chunk.to_csv(text_stream, header=False, index=False)
+    finally:
+        text_stream.flush()
+        text_stream.detach() # target은 호출자가 닫도록 분리
+
+
+def _write_parquet(row_groups: Iterable[pd.DataFrame], target: BinaryIO):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([
+        (COL_RECOVERY_HORIZON, pa.int64()), (COL_DEPOSIT_PCT, pa.int64()), (COL_RECOVERY_LEVERAGE, pa.float64()),
+        (COL_TRADE_ROUND, pa.int64()), (COL_MARKET_GAIN_PCT, pa.float64()),
+        (COL_CUMULATIVE_CAPITAL_AMT, pa.float64()), (COL_NET_PROFIT_AMT, pa.float64()),
+        (COL_LIQUIDATION_DISTANCE_PCT, pa.float64()), (COL_RUIN_PROBABILITY_PCT, pa.float64()),
+    ])
+    with pq.ParquetWriter(target, schema) as writer:
+        for chunk in row_groups:
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+
+
+def _write_xlsx(row_groups: Iterable[pd.DataFrame], target: BinaryIO):
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True) # write_only 모드는 행을 순차 기록하며 메모리에 시트를 유지하지 않음
+    sheet = workbook.create_sheet("scenarios")
+    sheet.append(EXPORT_COLUMNS)
+    for chunk in row_groups:
+        for row in chunk.itertuples(index=False, name=None):
+            # 엑셀은 inf/nan을 표현할 수 없으므로 빈 셀로 기록
+            sheet.append([None if isinstance(v, float) and not np.isfinite(v) else v for v in row])
+    workbook.save(target)
+
+
+_WRITERS = {"csv": _write_csv, "parquet": _write_parquet, "xlsx": _write_xlsx}
+
+
+def write_scenario_export(
+    frames: Iterable[pd.DataFrame],
+    target: Union[str, Path, BinaryIO],
+    fmt: str,
+    row_group_rows: int = EXPORT_ROW_GROUP_ROWS
+):
+    """
+    iter_scenario_frames의 결과를 fmt('csv', 'parquet', 'xlsx') 형식으로 target에 기록합니다.
+    target은 파일 경로 또는 바이너리 파일 객체입니다.
+    """
+    if fmt not in _WRITERS:
+        raise ValueError(f"지원하지 않는 내보내기 형식입니다: {fmt}")
+    row_groups = _iter_row_groups(frames, row_group_rows)
+    if isinstance(target, (str, Path)):
+        with open(target, "wb") as f:
+            _WRITERS[fmt](row_groups, f)
+    else:
+        _WRITERS[fmt](row_groups, target)
@@ -0,0 +1,238 @@
+# src/loss_recovery_pro/loadtest.py
+"""
+여러 Streamlit 세션이 동시에 앱을 사용하는 상황을 로컬에서 재현하는 부하 테스트 도구.
+streamlit.testing의 AppTest로 세션마다 사이드바 조작, 표 셀 수정, 초기화를 반복하고
+동시 세션 수(N)별 rerun 지연 백분위수, 세션당 edited_data 메모리 증가량, 프로세스 CPU 사용률을 출력합니다.
+
+AppTest는 프로세스 전역 Runtime을 사용하므로 한 프로세스 안에서 rerun을 동시에 실행할 수 없습니다.
+그래서 세션들은 각자 스레드에서 돌고 rerun만 하나씩 순서대로 실행되며, 락 안에서 측정한 서비스 시간과
+락 대기 시간을 따로 집계합니다 (전체 지연 = 서비스 + 대기).
+계산 위주의 rerun이 GIL을 나눠 쓰는 단일 서버 프로세스와 같은 조건이며, 결과 캐시와 예측 계산 풀도 실제처럼 공유됩니다.
+
+사용 예 (src 디렉토리에서):
+    python -m loss_recovery_pro.loadtest --sessions 1,4,16 --actions 30
+"""
+import argparse
+import random
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from streamlit.testing.v1 import AppTest
+
+from .config import DEPOSIT_INFO, MAX_RECOVERY_TRADES_LIMIT, COL_MARKET_GAIN_PCT, COL_NET_PROFIT_AMT
+from .precompute import get_recovery_steps_batch
+from .ui_main_panel import build_display_table
+
+APP_SCRIPT_PATH = Path(__file__).resolve().parent / "app.py"
+# 실제 사용 패턴에 가까운 동작 비중 (사이드바 미세 조정과 셀 수정이 대부분)
+ACTION_WEIGHTS = {
+    "max_trades": 3,
+    "market_loss": 3,
+    "initial_capital": 1,
+    "loss_margin": 1,
+    "volatility": 1,
+    "edit_cell": 4,
+    "reset_table": 1,
+}
+
+_rerun_lock = threading.Lock()
+
+
+def _edited_data_bytes(at: AppTest) -> int:
+    """세션의 st.session_state.edited_data에 보관된 DataFrame들의 메모리 사용량(바이트)."""
+    edited_data = at.session_state["edited_data"] if "edited_data" in at.session_state else {}
+    return int(sum(df.memory_usage(deep=True).sum() for df in edited_data.values()))
+
+
+def _steps_for_tab(at: AppTest, tab_idx: int) -> int:
+    # 탭 제목 '{n}회 거래'에서 거래 횟수를 읽음
+    return int(at.tabs[tab_idx].label.split("회")[0])
+
+
+def _apply_cell_edit(at: AppTest, rng: random.Random):
+    """
+    st.data_editor 편집은 AppTest에서 직접 조작할 수 없으므로, 편집 콜백(handle_data_editor_change)이
+    남기는 것과 같은 상태(수정된 표와 마지막 편집 셀 정보)를 세션 상태에 기록합니다.
+    """
+    tab_idx = rng.randrange(len(at.tabs))
+    deposit_pct_key = rng.choice(list(DEPOSIT_INFO))
+    trade_steps = _steps_for_tab(at, tab_idx)
+    row = rng.randrange(trade_steps)
+    info = DEPOSIT_INFO[deposit_pct_key]
+
+    edited_data = dict(at.session_state["edited_data"])
+    table_df = edited_data.get((tab_idx, deposit_pct_key))
+    if table_df is None:
+        # 앱과 같은 엔진/캐시 경로로 계산하고 같은 함수로 표를 만들어, 편집 콜백이 저장할 표와 일치시킴
+        (steps,) = get_recovery_steps_batch([(
+            at.session_state["initial_capital"], at.session_state["actual_account_loss_pct"], info["leverage"], trade_steps,
+            None, None, None
+        )])
+        table_df = build_display_table(*steps, info["margin_rate"], at.session_state["trade_volatility_pct"])
+    table_df = table_df.copy()
+
+    if rng.random() < 0.5:
+        col_name, new_value = COL_MARKET_GAIN_PCT, f"{rng.uniform(0.5, 30.0):.2f}"
+    else:
+        col_name, new_value = COL_NET_PROFIT_AMT, f"{rng.uniform(1e4, 5e5):.0f}"
+    table_df.loc[table_df.index[row], col_name] = new_value
+    edited_data[(tab_idx, deposit_pct_key)] = table_df
+
+    last_edited_cell_info = dict(at.session_state["last_edited_cell_info"]) if "last_edited_cell_info" in at.session_state else {}
+    last_edited_cell_info[(tab_idx, deposit_pct_key)] = {"row": row, "col_name": col_name, "new_value": float(new_value)}
+    at.session_state["edited_data"] = edited_data
+    at.session_state["last_edited_cell_info"] = last_edited_cell_info
+    at.run()
+
+
+def _run_action(at: AppTest, action: str, rng: random.Random) -> bool:
+    """action 하나를 수행합니다. 실제로 rerun이 실행되지 않았으면 False를 반환합니다."""
+    if action == "max_trades":
+        current = at.session_state["max_recovery_trades"]
+        next_value = min(max(current + rng.choice([-1, 1]), 1), MAX_RECOVERY_TRADES_LIMIT)
+        at.sidebar.slider(key="sb_max_recovery_trades").set_value(next_value).run()
+    elif action == "market_loss":
+        widget = at.sidebar.number_input(key="sb_market_loss_input_pct")
+        (widget.increment() if rng.random() < 0.5 or widget.value < 0.1 else widget.decrement()).run()
+    elif action == "initial_capital":
+        at.sidebar.number_input(key="sb_initial_capital").set_value(float(rng.randrange(5, 500) * 100000)).run()
+    elif action == "loss_margin":
+        at.sidebar.selectbox(key="sb_loss_margin_pct_at_loss").set_value(rng.choice(list(DEPOSIT_INFO))).run()
+    elif action == "volatility":
+        at.sidebar.number_input(key="sb_trade_volatility_pct").set_value(rng.choice([1.0, 2.0, 3.0, 5.0])).run()
+    elif action == "edit_cell":
+        _apply_cell_edit(at, rng)
+    elif action == "reset_table":
+        edited_keys = list(at.session_state["edited_data"].keys())
+        if not edited_keys:
+            _apply_cell_edit(at, rng)
+            return True
+        tab_idx, deposit_pct_key = rng.choice(edited_keys)
+        if tab_idx >= len(at.tabs): # 최대 거래 횟수가 줄어 사라진 탭의 수정 정보
+            return False
+        at.button(key=f"reset_btn_tab{tab_idx}_lev{deposit_pct_key}").click().run()
+    return True
+
+
+def _locked_call(fn, *args):
+    """_rerun_lock을 잡고 fn을 실행하여 (결과, 락 대기 시간, 락 안에서의 서비스 시간)을 반환합니다."""
+    queued = time.perf_counter()
+    with _rerun_lock:
+        acquired = time.perf_counter()
+        result = fn(*args)
+        finished = time.perf_counter()
+    return result, acquired - queued, finished - acquired
+
+
+def drive_session(session_idx: int, actions: int, seed: int, timeout: float) -> Dict[str, Any]:
+    """
+    세션 하나를 생성하여 actions회 조작하고 (rerun별 서비스 시간과 락 대기 시간, edited_data 메모리 변화, 오류 수)를
+    반환합니다. 사용자가 체감하는 지연은 두 시간의 합입니다.
+    """
+    rng = random.Random(seed * 7919 + session_idx)
+    at = AppTest.from_file(str(APP_SCRIPT_PATH), default_timeout=timeout)
+    _, queue_wait, service_time = _locked_call(at.run)
+    service_times, queue_waits = [service_time], [queue_wait]
+    initial_bytes = _edited_data_bytes(at)
+    errors = len(at.exception)
+
+    action_names = list(ACTION_WEIGHTS)
+    action_weights = list(ACTION_WEIGHTS.values())
+    for _ in range(actions):
+        action = rng.choices(action_names, weights=action_weights)[0]
+        try:
+            ran, queue_wait, service_time = _locked_call(_run_action, at, action, rng)
+        except Exception as e: # 한 세션의 오류가 전체 측정을 멈추지 않도록 집계만 함
+            errors += 1
+            print(f"  세션 {session_idx} '{action}' 실패: {e!r}", file=sys.stderr)
+            continue
+        if not ran: # rerun 없이 끝난 조작은 지연 표본에서 제외
+            continue
+        service_times.append(service_time)
+        queue_waits.append(queue_wait)
+        errors += len(at.exception)
+
+    return {
+        "service_times": service_times,
+        "queue_waits": queue_waits,
+        "edited_data_growth_bytes": _edited_data_bytes(at) - initial_bytes,
+        "edited_tables": len(at.session_state["edited_data"]),
+        "errors": errors,
+    }
+
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return float('nan')
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100.0 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def run_load_level(sessions: int, actions: int, seed: int = 0, timeout: float = 60.0) -> Dict[str, Any]:
+    """sessions개의 세션을 동시에 실행하고 지연(전체/서비스/대기) 백분위수, 메모리 증가, CPU 사용률을 집계합니다."""
+    wall_started = time.perf_counter()
+    cpu_started = time.process_time()
+    with ThreadPoolExecutor(max_workers=sessions) as pool:
+        results = list(pool.map(lambda idx: drive_session(idx, actions, seed, timeout), range(sessions)))
+    wall_elapsed = time.perf_counter() - wall_started
+    cpu_elapsed = time.process_time() - cpu_started
+
+    latencies = sorted(
+        service + wait
+        for result in results
+        for service, wait in zip(result["service_times"], result["queue_waits"])
+    )
+    service_times = sorted(value for result in results for value in result["service_times"])
+    queue_waits = sorted(value for result in results for value in result["queue_waits"])
+    growths = [result["edited_data_growth_bytes"] for result in results]
+    return {
+        "sessions": sessions,
+        "reruns": len(latencies),
+        "p50_ms": _percentile(latencies, 50) * 1000,
+        "p90_ms": _percentile(latencies, 90) * 1000,
+        "p99_ms": _percentile(latencies, 99) * 1000,
+        "max_ms": (latencies[-1] if latencies else float('nan')) * 1000,
+        "service_p50_ms": _percentile(service_times, 50) * 1000,
+        "service_p99_ms": _percentile(service_times, 99) * 1000,
+        "wait_p50_ms": _percentile(queue_waits, 50) * 1000,
+        "wait_p99_ms": _percentile(queue_waits, 99) * 1000,
+        "reruns_per_sec": len(latencies) / wall_elapsed if wall_elapsed > 0 else float('inf'),
+        "cpu_util_pct": cpu_elapsed / wall_elapsed * 100 if wall_elapsed > 0 else float('nan'),
+        "cpu_ms_per_rerun": cpu_elapsed / len(latencies) * 1000 if latencies else float('nan'),
+        "mem_growth_avg_kb": statistics.mean(growths) / 1024 if growths else 0.0,
+        "mem_growth_max_kb": max(growths) / 1024 if growths else 0.0,
+        "errors": sum(result["errors"] for result in results),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="동시 Streamlit 세션 부하 테스트")
+    parser.add_argument("--sessions", default="1,2,4,8", help="동시 세션 수 목록 (쉼표 구분)")
+    parser.add_argument("--actions", type=int, default=20, help="세션당 조작 횟수")
+    parser.add_argument("--seed", type=int, default=0, help="조작 순서 생성 시드")
+    parser.add_argument("--timeout", type=float, default=60.0, help="rerun 한 번의 제한 시간(초)")
+    args = parser.parse_args(argv)
+
+    session_levels = [int(value) for value in args.sessions.split(",") if value.strip()]
+    print(f"{'세션':>4} {'rerun':>6} {'p50(ms)':>8} {'p90(ms)':>8} {'p99(ms)':>8} {'max(ms)':>8} "
+          f"{'서비스 p50/p99(ms)':>18} {'대기 p50/p99(ms)':>18} {'rerun/s':>8} {'CPU%':>6} {'CPU ms/rerun':>12} {'메모리 증가 평균/최대(KB)':>22} {'오류':>4}")
+    has_errors = False
+    for sessions in session_levels:
+        report = run_load_level(sessions, args.actions, args.seed, args.timeout)
+        has_errors = has_errors or report["errors"] > 0
+        print(f"{report['sessions']:>4} {report['reruns']:>6} {report['p50_ms']:>8.1f} {report['p90_ms']:>8.1f} "
+              f"{report['p99_ms']:>8.1f} {report['max_ms']:>8.1f} "
+              f"{report['service_p50_ms']:>8.1f} / {report['service_p99_ms']:<7.1f} "
+              f"{report['wait_p50_ms']:>8.1f} / {report['wait_p99_ms']:<7.1f} {report['reruns_per_sec']:>8.1f} "
+              f"{report['cpu_util_pct']:>6.0f} {report['cpu_ms_per_rerun']:>12.1f} "
+              f"{report['mem_growth_avg_kb']:>10.1f} / {report['mem_growth_max_kb']:<9.1f} {report['errors']:>4}")
+    return 1 if has_errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
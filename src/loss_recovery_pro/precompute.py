@@ -0,0 +1,146 @@
+# src/loss_recovery_pro/precompute.py
+"""
+계산 결과 캐시와, 사용자가 다음에 입력할 가능성이 높은 값(인접 입력값)에 대한 백그라운드 예측 계산.
+"""
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .config import RESULT_CACHE_MAX_ENTRIES, SPECULATIVE_MAX_WORKERS, RECOVERY_ENGINE
+from .executor import RECOVERY_ENGINES, TableJob, compute_recovery_tables
+
+RecoverySteps = Tuple[np.ndarray, np.ndarray, np.ndarray]
+# (초기 원금, 실제 계좌 손실률(%), 복구 레버리지, 거래 횟수)
+CacheKey = Tuple[float, float, float, int]
+
+
+def _make_cache_key(initial_capital: float, actual_total_loss_pct: float, recovery_leverage: float, trade_steps: int) -> CacheKey:
+    # 위젯 step 연산(예: 7.67 + 0.1)의 부동소수점 오차로 키가 어긋나지 않도록 반올림
+    return (round(initial_capital, 6), round(actual_total_loss_pct, 9), recovery_leverage, trade_steps)
+
+
+class RecoveryResultCache:
+    """사용자 수정이 없는 표의 계산 결과를 보관하는 스레드 안전 LRU 캐시 (모든 세션이 공유)."""
+
+    def __init__(self, max_entries: int):
+        self._max_entries = max_entries
+        self._entries: "OrderedDict[CacheKey, RecoverySteps]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: CacheKey) -> Optional[RecoverySteps]:
+        with self._lock:
+            result = self._entries.get(key)
+            if result is not None:
+                self._entries.move_to_end(key)
+            return result
+
+    def __contains__(self, key: CacheKey) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def put(self, key: CacheKey, result: RecoverySteps):
+        with self._lock:
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+
+_result_cache = RecoveryResultCache(RESULT_CACHE_MAX_ENTRIES)
+_speculation_executor = ThreadPoolExecutor(max_workers=SPECULATIVE_MAX_WORKERS, thread_name_prefix="loss-recovery-speculate")
+
+
+def _freeze(values: np.ndarray) -> np.ndarray:
+    # 캐시 결과는 여러 세션이 공유하므로 읽기 전용으로 보관
+    values.flags.writeable = False
+    return values
+
+
+def _has_edits(job: TableJob) -> bool:
+    return any(v is not None for edits in job[4:] for v in (edits or []))
+
+
+def _compute_and_cache(key: CacheKey, initial_capital: float, actual_total_loss_pct: float,
+                       recovery_leverage: float, trade_steps: int) -> RecoverySteps:
+    engine_func = RECOVERY_ENGINES[RECOVERY_ENGINE][0]
+    result = tuple(_freeze(values) for values in engine_func(initial_capital, actual_total_loss_pct, recovery_leverage, trade_steps))
+    _result_cache.put(key, result)
+    return result
+
+
+def get_recovery_steps_batch(jobs: Sequence[TableJob]) -> List[RecoverySteps]:
+    """
+    여러 표의 (시장 수익률(%), 누적 자본, 순수익)을 jobs 순서대로 반환합니다.
+    사용자 수정이 없는 표는 캐시를 먼저 확인하고, 나머지는 executor로 한 번에 분배하여 계산합니다.
+    """
+    results: List[Optional[RecoverySteps]] = [None] * len(jobs)
+    pending: List[Tuple[int, Optional[CacheKey]]] = []
+    for idx, job in enumerate(jobs):
+        if _has_edits(job):
+            pending.append((idx, None))
+            continue
+        key = _make_cache_key(*job[:4])
+        cached = _result_cache.get(key)
+        if cached is not None:
+            results[idx] = cached
+        else:
+            pending.append((idx, key))
+
+    if pending:
+        computed = compute_recovery_tables([jobs[idx] for idx, _ in pending])
+        for (idx, key), steps in zip(pending, computed):
+            frozen = tuple(_freeze(values) for values in steps)
+            if key is not None:
+                _result_cache.put(key, frozen)
+            results[idx] = frozen
+    return results
+
+
+class SpeculationHandle:
+    """한 세션이 예약한 예측 계산 작업들. 입력이 다시 바뀌면 cancel()로 즉시 중단합니다."""
+
+    def __init__(self):
+        self._cancelled = threading.Event()
+        self._futures: List[Future] = []
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def cancel(self):
+        self._cancelled.set()
+        for future in self._futures:
+            future.cancel() # 아직 시작하지 않은 작업은 큐에서 제거됨
+
+
+def _speculate_one(handle: SpeculationHandle, key: CacheKey, initial_capital: float, actual_total_loss_pct: float,
+                   recovery_leverage: float, trade_steps: int):
+    if handle.cancelled or key in _result_cache:
+        return
+    _compute_and_cache(key, initial_capital, actual_total_loss_pct, recovery_leverage, trade_steps)
+
+
+def schedule_speculative_precompute(
+    initial_capital: float,
+    candidate_inputs: Iterable[Tuple[float, List[int]]],
+    recovery_leverages: List[float]
+) -> SpeculationHandle:
+    """
+    candidate_inputs의 각 (실제 계좌 손실률(%), 표시할 거래 횟수 목록)에 대해
+    모든 레버리지 표를 백그라운드에서 미리 계산하여 캐시에 넣습니다.
+    이미 캐시에 있는 표는 예약하지 않습니다.
+    """
+    handle = SpeculationHandle()
+    for actual_total_loss_pct, steps_to_show in candidate_inputs:
+        for trade_steps in steps_to_show:
+            for recovery_leverage in recovery_leverages:
+                key = _make_cache_key(initial_capital, actual_total_loss_pct, recovery_leverage, trade_steps)
+                if key in _result_cache:
+                    continue
+                handle._futures.append(_speculation_executor.submit(
+                    _speculate_one, handle, key, initial_capital, actual_total_loss_pct, recovery_leverage, trade_steps
+                ))
+    return handle
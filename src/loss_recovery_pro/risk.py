@@ -0,0 +1,63 @@
+# src/loss_recovery_pro/risk.py
+"""
+증거금 비율별 청산(마진콜) 거리와 복구 기간 동안의 누적 청산 확률 계산.
+"""
+import math
+from typing import Dict, Sequence
+
+import numpy as np
+
+from .config import TRANSACTION_FEE_RATE, MAINTENANCE_MARGIN_RATE, COL_LIQUIDATION_DISTANCE_PCT, COL_RUIN_PROBABILITY_PCT
+
+
+def calculate_liquidation_distance_pct(
+    margin_rate: float,
+    maintenance_margin_rate: float = MAINTENANCE_MARGIN_RATE
+) -> float:
+    """
+    포지션 진입 직후부터 마진콜이 발생하는 시장 하락률(%)을 계산합니다.
+    자본 C, 포지션 P = C / margin_rate, 진입 수수료 P·fee, 하락률 x 일 때
+    순자산 C - P·fee - P·x 가 평가금액 P·(1 - x)의 maintenance_margin_rate 배가 되는 x 입니다.
+    """
+    if maintenance_margin_rate >= 1.0:
+        return 0.0
+    distance_ratio = (margin_rate - TRANSACTION_FEE_RATE - maintenance_margin_rate) / (1.0 - maintenance_margin_rate)
+    return min(max(distance_ratio, 0.0), 1.0) * 100.0
+
+
+def calculate_ruin_probabilities(
+    market_gains_pct: Sequence[float],
+    liquidation_distance_pct: float,
+    trade_volatility_pct: float
+) -> np.ndarray:
+    """
+    각 회차까지의 누적 청산 확률(%)을 계산합니다.
+    1회 거래 동안 시장 가격을 표준편차 trade_volatility_pct의 드리프트 없는 브라운 운동으로 보고,
+    반사 원리에 따라 거래 중 청산 하락폭에 한 번이라도 닿을 확률 p = 2·Φ(-d/σ) 를 회차마다 독립 적용합니다.
+    회복불가(∞) 또는 N/A 회차는 nan 입니다.
+    """
+    gains = np.asarray(market_gains_pct, dtype=float)
+    if liquidation_distance_pct <= 0:
+        per_trade_ruin = 1.0
+    elif trade_volatility_pct <= 0:
+        per_trade_ruin = 0.0
+    else:
+        # 2·Φ(-z) = erfc(z / √2)
+        per_trade_ruin = math.erfc(liquidation_distance_pct / trade_volatility_pct / math.sqrt(2.0))
+    trade_numbers = np.arange(1, len(gains) + 1)
+    ruin_probabilities = (1.0 - (1.0 - per_trade_ruin) ** trade_numbers) * 100.0
+    return np.where(np.isfinite(gains), ruin_probabilities, np.nan)
+
+
+def build_risk_columns(
+    market_gains_pct: Sequence[float],
+    margin_rate: float,
+    trade_volatility_pct: float
+) -> Dict[str, np.ndarray]:
+    """복구 표에 덧붙일 (청산 하락폭(%), 누적 청산 확률(%)) 숫자 컬럼을 반환합니다."""
+    gains = np.asarray(market_gains_pct, dtype=float)
+    liquidation_distance_pct = calculate_liquidation_distance_pct(margin_rate)
+    return {
+        COL_LIQUIDATION_DISTANCE_PCT: np.where(np.isfinite(gains), liquidation_distance_pct, np.nan),
+        COL_RUIN_PROBABILITY_PCT: calculate_ruin_probabilities(gains, liquidation_distance_pct, trade_volatility_pct),
+    }
@@ -2,7 +2,18 @@
 공통 UI 컴포넌트 및 스타일링 함수
 """
 import streamlit as st
-from typing import Any
+import numpy as np
+from typing import Sequence
+
+# 시장 수익률 구간별 표시 라벨 (음수, 10% 미만, 25% 미만, 25% 이상, 회복불가)
+GAIN_BAND_LABELS = {
+    "negative": "🟥 음수",
+    "low": "🟩 10% 미만",
+    "mid": "🟨 25% 미만",
+    "high": "🟧 25% 이상",
+    "unrecoverable": "⬜ 회복불가",
+}
+NEGATIVE_PROFIT_MARK = " 📉" # 해당 회차 순수익이 음수일 때 덧붙임
 
 def apply_sidebar_style():
     """사이드바 스타일을 적용합니다."""
@@ -18,22 +29,23 @@ def apply_sidebar_style():
         </style>
     """, unsafe_allow_html=True)
 
-def style_profit_cell(value: Any) -> str:
-    """데이터 프레임의 셀에 조건부 스타일링을 적용합니다."""
-    default_style = "color: black; text-align: right;"
-    val_str = str(value)
-    if val_str == '∞ (회복불가)' or val_str == 'inf%':
-        return f"background-color: #e0e0e0; {default_style}"
-    try:
-        num_value = float(val_str.replace('%', '').replace('₩', '').replace(',', ''))
-        if isinstance(value, str) and '%' in value: # 수익률인 경우
-            if num_value < 10.0: return f"background-color: #dcedc8; {default_style}"
-            elif num_value < 20.0: return f"background-color: #fff9c4; {default_style}"
-            else: return f"background-color: #ffecb3; {default_style}"
-        # 다른 숫자 값 (자본, 순수익)은 기본 스타일
-        return default_style
-    except ValueError:
-        return default_style
+def build_gain_band_labels(
+    market_gains_pct: Sequence[float],
+    net_profits: Sequence[float]
+) -> np.ndarray:
+    """
+    숫자 수익률/순수익 배열로부터 회차별 수익률 구간 라벨을 한 번에 계산합니다.
+    st.data_editor에는 편집 불가 텍스트 컬럼으로 전달하므로 셀 단위 스타일 직렬화가 없습니다.
+    """
+    gains = np.asarray(market_gains_pct, dtype=float)
+    profits = np.asarray(net_profits, dtype=float)
+    band_labels = np.select(
+        [np.isposinf(gains), gains < 0, gains < 10.0, gains < 25.0, gains >= 25.0], # nan(N/A)은 빈 라벨
+        [GAIN_BAND_LABELS["unrecoverable"], GAIN_BAND_LABELS["negative"], GAIN_BAND_LABELS["low"],
+         GAIN_BAND_LABELS["mid"], GAIN_BAND_LABELS["high"]],
+        default=""
+    ).astype(object)
+    return np.where(profits < 0, band_labels + NEGATIVE_PROFIT_MARK, band_labels)
 
 def display_header():
     """앱 헤더를 표시합니다."""
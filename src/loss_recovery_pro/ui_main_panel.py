@@ -1,39 +1,32 @@
 # src/loss_recovery_pro/ui_main_panel.py
 import streamlit as st
 import pandas as pd
+import io
 from typing import List, Dict, Any, Callable, Optional, Tuple
 
-from .config import DEPOSIT_INFO, TRANSACTION_FEE_RATE, COL_TRADE_ROUND, COL_MARKET_GAIN_PCT, COL_CUMULATIVE_CAPITAL_AMT, COL_NET_PROFIT_AMT
-from .calculator import generate_recovery_table_data
+from .config import DEPOSIT_INFO, TRANSACTION_FEE_RATE, MAX_RECOVERY_TRADES_LIMIT, MAINTENANCE_MARGIN_RATE, COL_TRADE_ROUND, COL_MARKET_GAIN_PCT, COL_GAIN_BAND, COL_CUMULATIVE_CAPITAL_AMT, COL_NET_PROFIT_AMT, COL_LIQUIDATION_DISTANCE_PCT, COL_RUIN_PROBABILITY_PCT
+from .calculator import solve_loss_inputs_batch, build_recovery_table
+from .precompute import get_recovery_steps_batch, schedule_speculative_precompute
 from .app_state import get_edited_data_for_table # 콜백에서 edited_data를 업데이트하므로, 여기서는 읽기만 함
+from .risk import build_risk_columns
+from .ui_components import build_gain_band_labels
+from .exporter import EXPORT_FORMATS, available_export_formats, iter_scenario_frames, write_scenario_export
 
-def style_data_cell(value: Any) -> str:
-    """DataFrame 셀의 값에 따라 스타일을 적용합니다."""
-    default_style = "color: black; text-align: right;"
-    val_str = str(value)
-
-    if '₩' in val_str and val_str != '₩ 0': # 금액 (0이 아닌 경우)
-        try:
-            num_val = float(val_str.replace('₩','').replace(',',''))
-            if num_val < 0: return f"color: red; {default_style}" # 손실 금액은 빨간색
-            return default_style
-        except ValueError: # '₩' 포함 문자열이 숫자로 변환 안될 때 (예: 컬럼명에 '₩'이 들어간 경우)
-            return "color: black; text-align: center; font-weight: bold;"
-    elif val_str == COL_TRADE_ROUND or '₩' in val_str : # 거래 회차 또는 '₩ 0'
-            return "color: black; text-align: center; font-weight: bold;" # 회차는 중앙, 굵게
-    
-    if val_str == '∞ (회복불가)':
-        return f"background-color: #E0E0E0; {default_style} font-weight: bold;"
-
-    try: # 수익률(%) 처리
-        num_value = float(val_str.replace('%', ''))
-        if num_value < 0 : return f"background-color: #FFCDD2; {default_style}" 
-        elif num_value < 10.0: return f"background-color: #C8E6C9; {default_style}" 
-        elif num_value < 25.0: return f"background-color: #FFF9C4; {default_style}" 
-        else: return f"background-color: #FFECB3; {default_style}" 
-    except ValueError: # 숫자 변환 안되면 (주로 컬럼명)
-        return "color: black; text-align: center; font-weight: bold;"
-
+def build_display_table(
+    market_gains, cumulative_capitals, net_profits,
+    margin_rate: float,
+    trade_volatility_pct: float
+) -> pd.DataFrame:
+    """
+    계산 결과 배열로 st.data_editor에 표시할 표(수익률 구간 라벨, 청산 위험 컬럼 포함)를 만듭니다.
+    편집 콜백이 비교하는 수정 전 표와 같은 형태이므로, 표를 만드는 곳은 모두 이 함수를 사용합니다.
+    """
+    # 수익률 구간 라벨과 청산 위험 컬럼까지 숫자 결과로 먼저 계산한 뒤 표를 한 번에 생성
+    return build_recovery_table(
+        market_gains, cumulative_capitals, net_profits,
+        gain_band_labels=build_gain_band_labels(market_gains, net_profits),
+        extra_columns=build_risk_columns(market_gains, margin_rate, trade_volatility_pct)
+    )
 
 def parse_edited_value(value_from_editor: Any, type_hint: str = 'pct') -> Optional[float]:
     """
@@ -108,13 +101,79 @@ def _prepare_inputs_for_calculator(
     return user_fixed_gains, user_fixed_profits, user_edit_priority
 
 
+def _get_steps_to_show(max_trades: int) -> List[int]:
+    """탭으로 표시할 복구 거래 횟수 목록 (1~5회 및 최대 횟수)을 반환합니다."""
+    steps_to_show: List[int] = sorted(list(set([1, 2, 3, 4, 5, max_trades]))) 
+    steps_to_show = [s for s in steps_to_show if 0 < s <= max_trades]
+    if not steps_to_show and max_trades > 0: steps_to_show.append(max_trades)
+    return sorted(list(set(steps_to_show)))
+
+
+def _render_export_section(initial_capital: float, actual_loss_pct: float, scenarios: List[Tuple[int, int, Any]], trade_volatility_pct: float):
+    """모든 탭 × 증거금 비율 표를 사용자 수정 사항을 반영하여 하나의 파일로 내보내는 UI를 렌더링합니다."""
+    with st.expander("📥 전체 시나리오 내보내기", expanded=False):
+        formats = available_export_formats()
+        export_cols = st.columns([0.4, 0.6])
+        with export_cols[0]:
+            fmt = st.selectbox("파일 형식", options=formats, key="export_format", label_visibility="collapsed")
+
+        # 수정 정보는 이번 rerun에서 확정된 값을 사용하고, 실제 계산·기록은 다운로드 클릭 시 별도 스레드에서 수행
+        def build_export_file():
+            # Streamlit은 다운로드 내용을 bytes로 보관하므로 BytesIO에 청크 단위로 기록하여 반환
+            export_buffer = io.BytesIO()
+            write_scenario_export(iter_scenario_frames(initial_capital, actual_loss_pct, scenarios, trade_volatility_pct), export_buffer, fmt)
+            export_buffer.seek(0)
+            return export_buffer
+
+        mime_type, extension, _ = EXPORT_FORMATS[fmt]
+        with export_cols[1]:
+            st.download_button(
+                "📥 다운로드", data=build_export_file, file_name=f"loss_recovery_scenarios{extension}",
+                mime=mime_type, key="export_download_btn", on_click="ignore", use_container_width=True
+            )
+        st.caption("모든 회차 탭과 증거금 비율의 표가 수정 사항을 반영하여 숫자 컬럼(long format)으로 저장됩니다.")
+
+
+def _schedule_adjacent_inputs(initial_capital: float, actual_loss_pct: float, recovery_leverages: List[float]):
+    """
+    사용자가 다음에 조정할 가능성이 높은 인접 입력값(최대 거래 횟수 ±1, 시장 손실률 ±0.1%)의
+    표를 백그라운드에서 미리 계산합니다.
+    """
+    max_trades = st.session_state.max_recovery_trades
+    market_loss_pct = st.session_state.market_loss_input_pct
+    loss_margin_key = st.session_state.loss_margin_pct_at_loss
+
+    candidate_inputs = []
+    for trades_delta in (1, -1):
+        next_max_trades = max_trades + trades_delta
+        if 1 <= next_max_trades <= MAX_RECOVERY_TRADES_LIMIT:
+            candidate_inputs.append((actual_loss_pct, _get_steps_to_show(next_max_trades)))
+    steps_to_show = _get_steps_to_show(max_trades)
+    next_market_loss_pcts = [market_loss_pct + loss_delta for loss_delta in (0.1, -0.1) if 0.0 <= market_loss_pct + loss_delta <= 100.0]
+    if next_market_loss_pcts:
+        _, _, _, next_actual_loss_pcts = solve_loss_inputs_batch(
+            [loss_margin_key] * len(next_market_loss_pcts),
+            initial_capitals=[initial_capital] * len(next_market_loss_pcts),
+            market_loss_input_pcts=next_market_loss_pcts
+        )
+        candidate_inputs.extend((float(pct), steps_to_show) for pct in next_actual_loss_pcts)
+
+    st.session_state._speculation_handle = schedule_speculative_precompute(initial_capital, candidate_inputs, recovery_leverages)
+
+
 def render_main_panel(handle_edit_callback: Callable, handle_reset_callback: Callable):
     """메인 패널 UI (결과 테이블 등)를 렌더링합니다."""
+    # 이전 rerun에서 예약한 예측 계산은 입력이 바뀌었으므로 즉시 중단
+    previous_speculation = st.session_state.get("_speculation_handle")
+    if previous_speculation is not None:
+        previous_speculation.cancel()
+
     st.title("💸 레버리지 손실 복구 계산기 Pro")
     
     initial_capital = st.session_state.initial_capital
     actual_loss_pct = st.session_state.get("actual_account_loss_pct", 0.0) 
     actual_loss_amt = st.session_state.get("actual_loss_amount", 0.0)
+    trade_volatility_pct = st.session_state.trade_volatility_pct
 
     st.markdown(
         f"초기 원금 **₩ {initial_capital:,.0f}**에서 실제 계좌 총 손실률 "
@@ -124,10 +183,7 @@ def render_main_panel(handle_edit_callback: Callable, handle_reset_callback: Cal
     st.caption(f"각 표의 '{COL_MARKET_GAIN_PCT}' 및 '{COL_NET_PROFIT_AMT}' 컬럼은 직접 수정 가능하며, 수정 시 해당 시나리오가 재계산됩니다. '초기화' 버튼으로 원래 계산값으로 되돌릴 수 있습니다.")
 
     max_trades = st.session_state.max_recovery_trades
-    steps_to_show: List[int] = sorted(list(set([1, 2, 3, 4, 5, max_trades]))) 
-    steps_to_show = [s for s in steps_to_show if 0 < s <= max_trades]
-    if not steps_to_show and max_trades > 0: steps_to_show.append(max_trades)
-    steps_to_show = sorted(list(set(steps_to_show)))
+    steps_to_show = _get_steps_to_show(max_trades)
 
     if not steps_to_show:
         st.warning("표시할 복구 거래 횟수가 없습니다.")
@@ -136,6 +192,17 @@ def render_main_panel(handle_edit_callback: Callable, handle_reset_callback: Cal
     if actual_loss_pct >= 100.0 and not any(st.session_state.edited_data): 
         st.error(f"실제 계좌 손실률이 {actual_loss_pct:.2f}%입니다. '{COL_MARKET_GAIN_PCT}' 또는 '{COL_NET_PROFIT_AMT}' 값을 수동 입력하여 시뮬레이션을 시작할 수 있습니다.")
 
+    sorted_deposit_info = sorted(DEPOSIT_INFO.items(), key=lambda item: item[1]["leverage"], reverse=True)
+
+    # 모든 탭 × 레버리지 표는 서로 독립적이므로, 입력을 먼저 모아 한 번에 계산한 뒤 순서대로 렌더링
+    table_keys = [(i, step_count, deposit_pct_key) for i, step_count in enumerate(steps_to_show) for deposit_pct_key, _ in sorted_deposit_info]
+    edit_inputs = [_prepare_inputs_for_calculator(step_count, i, deposit_pct_key) for i, step_count, deposit_pct_key in table_keys]
+    table_results = get_recovery_steps_batch([
+        (initial_capital, actual_loss_pct, DEPOSIT_INFO[deposit_pct_key]["leverage"], step_count, *inputs)
+        for (_, step_count, deposit_pct_key), inputs in zip(table_keys, edit_inputs)
+    ])
+    results_by_table = {(i, deposit_pct_key): result for (i, _, deposit_pct_key), result in zip(table_keys, table_results)}
+
     tab_titles = [f"{s}회 거래" for s in steps_to_show]
     tabs = st.tabs(tab_titles)
 
@@ -143,8 +210,6 @@ def render_main_panel(handle_edit_callback: Callable, handle_reset_callback: Cal
         with tab_widget: 
             current_trade_step_count = steps_to_show[i]
             st.subheader(f"🎯 {current_trade_step_count}회 거래로 원금 복구 (목표: ₩ {initial_capital:,.0f})")
-            
-            sorted_deposit_info = sorted(DEPOSIT_INFO.items(), key=lambda item: item[1]["leverage"], reverse=True)
 
             for deposit_pct_key, info in sorted_deposit_info:
                 recovery_leverage = info["leverage"]
@@ -156,45 +221,39 @@ def render_main_panel(handle_edit_callback: Callable, handle_reset_callback: Cal
                     st.markdown(f"##### {leverage_label}")
                 with title_cols[1]:
                     reset_button_key = f"reset_btn_tab{i}_lev{deposit_pct_key}"
-                    if st.button("⚙️ 초기화", key=reset_button_key, help="이 테이블의 모든 사용자 수정을 초기화합니다.", use_container_width=True):
-                        handle_reset_callback(i, deposit_pct_key)
-                        # 콜백에서 rerun하므로 여기서는 추가 작업 불필요
-                
-                user_fixed_gains, user_fixed_profits, user_edit_priority = _prepare_inputs_for_calculator(
-                    current_trade_step_count, i, deposit_pct_key
-                )
+                    # 표는 버튼보다 먼저 일괄 계산되므로, 초기화는 rerun 전에 실행되는 on_click 콜백으로 처리
+                    st.button("⚙️ 초기화", key=reset_button_key, help="이 테이블의 모든 사용자 수정을 초기화합니다.", use_container_width=True,
+                              on_click=handle_reset_callback, args=(i, deposit_pct_key))
                 
-                table_df = generate_recovery_table_data(
-                    initial_capital=initial_capital,
-                    actual_total_loss_pct=actual_loss_pct,
-                    recovery_leverage=recovery_leverage,
-                    trade_steps=current_trade_step_count,
-                    edited_gains_pct=user_fixed_gains,
-                    edited_net_profits=user_fixed_profits,
-                    edited_field_priority=user_edit_priority
-                )
+                market_gains, cumulative_capitals, net_profits = results_by_table[(i, deposit_pct_key)]
+                table_df = build_display_table(market_gains, cumulative_capitals, net_profits, info["margin_rate"], trade_volatility_pct)
                 
                 editor_key = f"editor_tab{i}_lev{deposit_pct_key}"
                 # data_editor에 전달되는 data_to_edit이 prev_df_for_comparison으로 사용됨
                 data_to_edit = table_df.copy() # 수정 전 상태를 콜백에 전달하기 위해 복사
 
-                # DataFrame 스타일 적용 (st.dataframe 대신 st.data_editor는 스타일 직접 적용 불가)
-                # 따라서, 표시는 data_editor로 하고, 값에 따른 시각적 피드백은 calculator에서 문자열 포맷팅 시 반영
-                # 또는 data_editor 이후에 st.dataframe(table_df.style.applymap(style_data_cell))을 추가로 보여줄 수도 있음 (중복 표시)
-                # 현재는 style_data_cell 함수는 사용되지 않음. generate_recovery_table_data에서 문자열 포맷팅으로 처리.
-
                 st.data_editor(
                     data_to_edit, 
                     key=editor_key, 
                     use_container_width=True, 
                     num_rows="fixed",
-                    disabled=[COL_TRADE_ROUND, COL_CUMULATIVE_CAPITAL_AMT], 
+                    disabled=[COL_TRADE_ROUND, COL_GAIN_BAND, COL_CUMULATIVE_CAPITAL_AMT, COL_LIQUIDATION_DISTANCE_PCT, COL_RUIN_PROBABILITY_PCT], 
+                    column_config={
+                        COL_GAIN_BAND: st.column_config.TextColumn(help="시장 수익률 구간입니다. 📉는 해당 회차 순수익이 음수임을 뜻합니다."),
+                        COL_LIQUIDATION_DISTANCE_PCT: st.column_config.NumberColumn(format="%.2f%%", help="이 하락률에 도달하면 마진콜(반대매매)이 발생합니다."),
+                        COL_RUIN_PROBABILITY_PCT: st.column_config.NumberColumn(format="%.2f%%", help="해당 회차까지 한 번이라도 청산 하락폭에 도달할 확률입니다."),
+                    },
                     hide_index=True, 
                     on_change=handle_edit_callback,
                     args=(i, deposit_pct_key, editor_key, data_to_edit.copy()) 
                 )
                 st.markdown("---") # 각 레버리지 테이블 구분을 위한 선
 
+    _render_export_section(initial_capital, actual_loss_pct, [
+        (step_count, deposit_pct_key, inputs) for (_, step_count, deposit_pct_key), inputs in zip(table_keys, edit_inputs)
+    ], trade_volatility_pct)
+    _schedule_adjacent_inputs(initial_capital, actual_loss_pct, [info["leverage"] for _, info in sorted_deposit_info])
+
     with st.expander("⚠️ 참고 및 주의사항", expanded=False):
         st.markdown(f"""
         - **손실 계산:**
@@ -207,8 +266,10 @@ def render_main_panel(handle_edit_callback: Callable, handle_reset_callback: Cal
             - 복구 시도 시에도 각 거래마다 해당 거래에 사용된 레버리지와 포지션 크기에 대한 편도 수수료 (`{TRANSACTION_FEE_RATE*100:.1f}%`)가 반영됩니다.
         - **복리 계산:** 모든 자본 계산은 복리 기준입니다.
         - **'∞ (회복불가)':** 해당 조건으로는 원금 회복이 수학적으로 불가능함을 의미합니다.
-        - **수익률 색상 가이드 (수익률 % 기준):** (generate_recovery_table_data에서 문자열 포맷으로 처리, style_data_cell은 data_editor에 직접 적용 안됨)
-            - 표시되는 값의 배경색은 현재 지원되지 않으며, 값 자체의 포맷팅(예: '∞ (회복불가)')으로 구분됩니다.
+        - **'{COL_LIQUIDATION_DISTANCE_PCT}':** 해당 증거금 비율로 진입한 직후, 순자산이 평가금액의 `{MAINTENANCE_MARGIN_RATE*100:.0f}%` 미만이 되어 마진콜이 발생하는 시장 하락률입니다. (진입 수수료 반영)
+        - **'{COL_RUIN_PROBABILITY_PCT}':** 사이드바의 '거래당 시장 변동성'을 기준으로, 해당 회차까지 거래 중 한 번이라도 청산 하락폭에 도달할 확률입니다. (드리프트 없는 정규 변동 가정)
+        - **'{COL_GAIN_BAND}' (수익률 % 기준):** 🟥 음수 / 🟩 10% 미만 / 🟨 25% 미만 / 🟧 25% 이상 / ⬜ 회복불가
+            - 회차별 순수익이 음수인 회차에는 📉 표시가 붙습니다.
         - **초기화 버튼:** 각 표 우측 상단의 '⚙️ 초기화' 버튼을 누르면 해당 표의 모든 사용자 수정 내용이 사라지고, 원래의 자동 계산 값으로 돌아갑니다.
         - **단순 시뮬레이션:** 본 결과는 시장 변동성, 슬리피지 등 실제 거래 변수를 고려하지 않은 단순 계산 결과입니다. 투자 결정은 신중히 하세요.
         """, unsafe_allow_html=True)
\ No newline at end of file
@@ -2,8 +2,8 @@
 import streamlit as st
 import math
 from .app_state import update_state_and_save_config
-from .config import DEPOSIT_INFO
-from .calculator import calculate_actual_account_metrics, calculate_initial_capital_from_loss_amount
+from .config import DEPOSIT_INFO, MAX_RECOVERY_TRADES_LIMIT
+from .calculator import solve_loss_inputs
 
 def render_sidebar():
     st.markdown("""
@@ -37,29 +37,31 @@ def render_sidebar():
         elif changed_field_key == "loss_margin_pct_at_loss":
             st.session_state.loss_margin_pct_at_loss = st.session_state.sb_loss_margin_pct_at_loss
             
-        # 현재 선택된 레버리지 (항상 최신 값 사용)
-        current_leverage_at_loss = DEPOSIT_INFO[st.session_state.loss_margin_pct_at_loss]["leverage"]
-
-        # 마지막 사용자 입력 소스에 따라 다른 필드 값을 조정
+        # 마지막 사용자 입력 소스에 따라 다른 필드 값을 조정 (계수표 기반 풀이를 변경당 한 번만 수행)
         if st.session_state._last_financial_input_source == "initial_capital" or \
            changed_field_key in ["market_loss_input_pct", "loss_margin_pct_at_loss"]:
             # 원금, 시장손실률, 증거금비율이 바뀌면 손실금 재계산
-            _, calculated_loss_amount = calculate_actual_account_metrics(
-                st.session_state.initial_capital,
-                st.session_state.market_loss_input_pct,
-                current_leverage_at_loss
+            _, calculated_loss_amount, _, actual_loss_pct = solve_loss_inputs(
+                st.session_state.loss_margin_pct_at_loss,
+                initial_capital=st.session_state.initial_capital,
+                market_loss_input_pct=st.session_state.market_loss_input_pct
             )
             st.session_state.actual_loss_amount = round(calculated_loss_amount, 0)
         
         elif st.session_state._last_financial_input_source == "loss_amount":
             # 손실금이 바뀌면 원금 재계산
-            calculated_capital = calculate_initial_capital_from_loss_amount(
-                st.session_state.actual_loss_amount,
-                st.session_state.market_loss_input_pct,
-                current_leverage_at_loss
+            calculated_capital, _, _, actual_loss_pct = solve_loss_inputs(
+                st.session_state.loss_margin_pct_at_loss,
+                actual_loss_amount=st.session_state.actual_loss_amount,
+                market_loss_input_pct=st.session_state.market_loss_input_pct
             )
             if not math.isnan(calculated_capital):
                 st.session_state.initial_capital = round(calculated_capital, 0)
+            # 실제 계좌 총 손실률은 (반올림된) 원금 기준
+            actual_loss_pct = actual_loss_pct if st.session_state.initial_capital > 0 else 0.0
+        
+        # 메인 패널 등에서 사용할 수 있도록 session_state에 저장 (렌더링 시 재계산하지 않음)
+        st.session_state.actual_account_loss_pct = actual_loss_pct
         
         # 모든 변경 후 설정 저장 (하나의 함수에서 모든 업데이트 처리 후 저장)
         # save_user_config_keys = ["initial_capital", "market_loss_input_pct", "loss_margin_pct_at_loss", "actual_loss_amount", "max_recovery_trades"]
@@ -111,16 +113,7 @@ def render_sidebar():
         help="실제 발생한 손실 금액을 입력하면, 초기 원금이 역산됩니다. 또는 초기 원금에 따라 자동 계산됩니다."
     )
 
-    # 실제 계좌 손실률은 항상 위 값들을 기준으로 계산되어 표시됨
-    # 이 시점에는 st.session_state.initial_capital 과 st.session_state.actual_loss_amount가 동기화된 상태여야 함.
-    final_actual_loss_percentage, _ = calculate_actual_account_metrics(
-        st.session_state.initial_capital,
-        st.session_state.market_loss_input_pct,
-        leverage_at_loss_display
-    )
-    # 이 값을 메인 패널 등에서 사용할 수 있도록 session_state에 저장
-    st.session_state.actual_account_loss_pct = final_actual_loss_percentage 
-
+    # 실제 계좌 손실률은 init_session_state / sync_financials_on_change에서 입력 변경 시에만 계산됨
     st.sidebar.metric(
         label="실제 계좌 총 손실률", value=f"{st.session_state.actual_account_loss_pct:.2f}%",
         delta="원금 대비" if st.session_state.actual_account_loss_pct < 100 else "원금 전액 이상 손실",
@@ -133,10 +126,16 @@ def render_sidebar():
     st.sidebar.subheader("♻️ 복구 시도 조건")
     
     max_trades_val = st.sidebar.slider( # 슬라이더는 on_change 콜백에서 직접 update_state_and_save_config 호출
-        "최대 복구 거래 횟수", min_value=1, max_value=20,
+        "최대 복구 거래 횟수", min_value=1, max_value=MAX_RECOVERY_TRADES_LIMIT,
         value=st.session_state.max_recovery_trades, key="sb_max_recovery_trades",
         help="손실된 원금을 복구하기 위해 시도할 최대 거래 횟수를 설정합니다.",
         on_change=lambda: update_state_and_save_config("max_recovery_trades", st.session_state.sb_max_recovery_trades)
     )
+    st.sidebar.number_input(
+        "거래당 시장 변동성 (%)", min_value=0.0, max_value=100.0,
+        value=float(st.session_state.trade_volatility_pct), step=0.5, format="%.1f", key="sb_trade_volatility_pct",
+        help="1회 복구 거래 동안 예상되는 시장 가격 변동성(표준편차)입니다. 누적 청산 확률 계산에 사용됩니다.",
+        on_change=lambda: update_state_and_save_config("trade_volatility_pct", st.session_state.sb_trade_volatility_pct)
+    )
     st.sidebar.markdown("---")
     st.sidebar.caption("© 2024-2025 Loss Recovery Pro")
\ No newline at end of file